@@ -6,6 +6,7 @@
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
+import numpy as np
 import cv2 # cv2 import'unu buraya ekleyin (Haar cascade yolları için)
 
 
@@ -467,6 +468,13 @@ class CameraConfig:
     FRAME_BUFFER_SIZE = 2
     USE_ZERO_COPY = True
     BUFFER_COUNT = 4
+    # Ana akış formatı: "RGB888" (3 bayt/piksel) veya "YUV420" (1.5 bayt/piksel; renk gerektiğinde BGR'ye çevrilir,
+    # capture_luma_frame() Y düzlemini doğrudan okur)
+    PIXEL_FORMAT = "RGB888"
+    # Yakalanan kareleri /dev/shm halka tamponuna da yaz (diğer süreçler SharedFrameRing.attach ile okur)
+    ENABLE_SHARED_FRAMES = False
+    SHARED_FRAME_NAME = "dreampi_frames"
+    SHARED_FRAME_SLOTS = 3
 
     # PERFORMANS OPTİMİZASYONU
     USE_GPU_ACCELERATION = True
@@ -795,6 +803,15 @@ class MotorConfig:
     H_MOTOR_IN3 = 13
     H_MOTOR_IN4 = 6
 
+    # lgpio kuruluysa dört pin tek grup olarak yazılır (adım başına tek çağrı).
+    # Pi 5: çekirdek 6.6.45+ ile gpiochip0, daha eskilerde gpiochip4
+    USE_GPIO_GROUP_WRITE = True
+    GPIO_CHIP = 0
+    # numba + liblgpio ile adım döngüsünü GIL'siz, derlenmiş olarak çalıştır (açı hareket sonunda güncellenir).
+    # Deneysel: yalnızca x86'da sahte liblgpio ile derlenip denendi, Pi 5 donanımında doğrulanmadı.
+    # Derleme başarısız olursa lgpio grubuna geri dönülür.
+    USE_NATIVE_STEP_LOOP = False
+
     # Dikey motor pinleri (opsiyonel)
     V_MOTOR_IN1 = None
     V_MOTOR_IN2 = None
@@ -809,6 +826,8 @@ class MotorConfig:
     STEPS_PER_REV = 4096
     INTER_STEP_DELAY = 0.003
     SETTLE_TIME = 0.05
+    # Bu kadar veya daha az adımlık hareketlerden sonra SETTLE_TIME beklenmez
+    SETTLE_MIN_STEPS = 8
 
     # Hız profilleri
     SPEED_PROFILES = {
@@ -824,11 +843,18 @@ class MotorConfig:
     BUTTON_STEP = 10
     FINE_STEP = 1
     BACKLASH_COMPENSATION = 2
+    # Hareket sürerken kuyrukta biriken mutlak hedeflerden yalnızca sonuncusuna gidilir
+    # (callback'li ve wait=True ile beklenen komutlar korunur)
+    COALESCE_COMMANDS = True
 
     STEP_SEQUENCE = [
         [1, 0, 0, 0], [1, 1, 0, 0], [0, 1, 0, 0], [0, 1, 1, 0],
         [0, 0, 1, 0], [0, 0, 1, 1], [0, 0, 0, 1], [1, 0, 0, 1]
     ]
+    # Adım döngüsünün kullandığı (8, 4) uint8 bobin tablosu
+    STEP_SEQUENCE_ARR = np.array(STEP_SEQUENCE, dtype=np.uint8)
+    # Her desen tek tamsayı maskesi (bit i = IN(i+1)): pin grubuna tek yazmada gönderilir
+    STEP_MASKS = (STEP_SEQUENCE_ARR.astype(np.uint32) << np.arange(4, dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
 
 
 # --- SENSÖR AYARLARI ---
@@ -1,6 +1,9 @@
 # dash_apps.py - GÜNCELLENMİŞ: İki Bağımsız Sensör, LCD/Buzzer/LED Kaldırıldı
 
 import atexit
+import csv
+import functools
+import glob
 import logging
 import os
 import sys
@@ -8,7 +11,9 @@ import subprocess
 import time
 import io
 import signal
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 import psutil
 import pandas as pd
@@ -16,20 +21,42 @@ import numpy as np
 import base64
 import json
 
-# Analiz kütüphaneleri
-from scipy.spatial import ConvexHull, QhullError
+# Analiz kütüphaneleri (scipy.spatial ilk kullanıldığı fonksiyonda yüklenir)
 from sklearn.cluster import DBSCAN
-from sklearn.linear_model import RANSACRegressor
+from sklearn.neighbors import NearestNeighbors
 from django.shortcuts import reverse, redirect
 # Dash ve Plotly Kütüphaneleri
 from django_plotly_dash import DjangoDash
-from dash import html, dcc, Output, Input, State, no_update, dash_table
+from dash import html, dcc, Output, Input, State, no_update, dash_table, Patch
 from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
+from plotly.colors import sample_colorscale, unlabel_rgb
 
 
+# Sütunsal tarama önbelleği (opsiyonel)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# GPU üzerinde kümeleme (opsiyonel - CUDA olan sunucularda)
+try:
+    from cuml.cluster import DBSCAN as CumlDBSCAN
+    CUML_AVAILABLE = True
+except ImportError:
+    CumlDBSCAN = None
+    CUML_AVAILABLE = False
+
+# Büyük nokta bulutları için sunucu tarafı rasterleştirme (opsiyonel)
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:
+    ds = None
+    tf = None
+
 # Google AI kütüphaneleri
 try:
     import google.generativeai as genai
@@ -46,9 +73,40 @@ SENSOR_SCRIPT_PATH = os.path.join(os.getcwd(), SENSOR_SCRIPT_FILENAME)
 AUTONOMOUS_SCRIPT_FILENAME = 'autonomous_drive_pi5.py'
 AUTONOMOUS_SCRIPT_PATH = os.path.join(os.getcwd(), AUTONOMOUS_SCRIPT_FILENAME)
 
+SCAN_EVENTS_URL = '/events/scan/'
+# Bir SSE olayında en fazla bu kadar yeni nokta gönderilir (fazlası hemen ardından gelen olaylarda)
+SCAN_EVENT_BATCH_SIZE = 2000
+
 SENSOR_SCRIPT_PID_FILE = '/tmp/sensor_scan_script.pid'
 AUTONOMOUS_SCRIPT_PID_FILE = '/tmp/autonomous_drive_script.pid'
 
+# En son taramanın ID'si bu süre önbellekte kalır (betikler PID dosyasını taramayı oluşturmadan önce yazar)
+LATEST_SCAN_CACHE_TTL = 5.0
+
+SCAN_CACHE_DIR = '/tmp/dreampi_scan_cache'
+# Periyodik sorgularda çekilmeyen büyük Scan alanları (yalnızca dışa aktarmada okunur)
+SCAN_DEFERRED_FIELDS = ('ai_commentary',)
+SCAN_POINT_FIELDS = (
+    'id', 'x_cm', 'y_cm', 'z_cm', 'derece', 'dikey_aci', 'mesafe_cm',
+    'h_sensor_distance', 'v_sensor_distance', 'hiz_cm_s', 'timestamp'
+)
+
+# DBSCAN kümeleme parametreleri
+CLUSTER_EPS_CM = 15
+CLUSTER_MIN_SAMPLES = 3
+# Bu sayının üzerindeki nokta kümeleri, cuML mevcutsa GPU'da kümelenir
+GPU_CLUSTER_MIN_POINTS = 1000
+
+# Bu sayının üzerindeki 2D haritalar tarayıcıya nokta yerine tek bir görüntü olarak gönderilir
+RASTERIZE_POINT_THRESHOLD = 100_000
+RASTER_CANVAS_SIZE = (800, 600)
+# Çizgi izleri (sektör sınırı) tarayıcıya gönderilmeden önce LTTB ile bu sayıya indirilir
+MAX_LINE_POINTS = 1000
+# Geçerli sayılan en büyük mesafe; grafik renk skalası da bu aralığa sabitlenir
+MAX_VALID_DISTANCE_CM = 400.0
+# 3D/polar grafiklere eklenen yeni nokta parçası bu sayıyı aşınca figür tek izle yeniden kurulur
+MAX_FIGURE_CHUNKS = 20
+
 FONT_AWESOME = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.2/css/all.min.css"
 
 app = DjangoDash(
@@ -81,14 +139,76 @@ navbar = dbc.NavbarSimple(
 
 
 # --- YARDIMCI FONKSİYONLAR ---
+_PROCESS_CACHE = {}
+_PID_FILE_CACHE = {}
+
+
 def is_process_running(pid):
-    """PID'nin çalışıp çalışmadığını kontrol et"""
+    """PID'nin çalışıp çalışmadığını kontrol et - psutil.Process nesneleri PID başına önbelleklenir"""
     if pid is None:
         return False
     try:
-        return psutil.pid_exists(pid)
+        proc = _PROCESS_CACHE.get(pid)
+        if proc is None:
+            proc = _PROCESS_CACHE[pid] = psutil.Process(pid)
+        # is_running() oluşturulma zamanını da karşılaştırır, PID yeniden kullanımını yakalar
+        if proc.is_running():
+            return True
     except Exception:
-        return False
+        pass
+    _PROCESS_CACHE.pop(pid, None)
+    return False
+
+
+def read_pid_file(pid_file):
+    """PID dosyasını oku - dosya değişmediyse (mtime aynı) önceki değeri döndür"""
+    try:
+        mtime = os.stat(pid_file).st_mtime_ns
+    except OSError:
+        _PID_FILE_CACHE.pop(pid_file, None)
+        return None
+
+    cached = _PID_FILE_CACHE.get(pid_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(pid_file, 'r') as f:
+            content = f.read().strip()
+        pid = int(content) if content else None
+    except (IOError, ValueError):
+        pid = None
+
+    _PID_FILE_CACHE[pid_file] = (mtime, pid)
+    return pid
+
+
+SYSTEM_STATS = {'cpu': 0.0, 'ram': 0.0}
+_SYSTEM_STATS_LOCK = threading.Lock()
+_system_stats_thread = None
+
+
+def _system_stats_sampler(interval=1.0):
+    """CPU/RAM kullanımını arka planda örnekle - callback'ler bloklanmadan son değeri okur"""
+    psutil.cpu_percent(interval=None)  # İlk çağrı referans noktası oluşturur
+    while True:
+        time.sleep(interval)
+        try:
+            SYSTEM_STATS['cpu'] = psutil.cpu_percent(interval=None)
+            SYSTEM_STATS['ram'] = psutil.virtual_memory().percent
+        except Exception as e:
+            logging.warning(f"Sistem istatistikleri okunamadı: {e}")
+
+
+def _ensure_system_stats_sampler():
+    """Örnekleyici thread'i ilk ihtiyaçta bir kez başlat (modül import'u migrate/shell'de thread açmasın)"""
+    global _system_stats_thread
+    if _system_stats_thread is not None:
+        return
+    with _SYSTEM_STATS_LOCK:
+        if _system_stats_thread is None:
+            _system_stats_thread = threading.Thread(target=_system_stats_sampler, name="SystemStatsSampler", daemon=True)
+            _system_stats_thread.start()
 
 
 def get_ai_model_options():
@@ -103,17 +223,122 @@ def get_ai_model_options():
         return [{'label': 'DB Hatası', 'value': '', 'disabled': True}]
 
 
+_LATEST_SCAN_CACHE = {'key': None, 'time': 0.0, 'scan_id': None}
+
+
+def _pid_files_signature():
+    """Betik PID dosyalarının mtime değerleri - tarama başlayıp bittiğinde değişir"""
+    signature = []
+    for pid_file in (SENSOR_SCRIPT_PID_FILE, AUTONOMOUS_SCRIPT_PID_FILE):
+        try:
+            signature.append(os.stat(pid_file).st_mtime_ns)
+        except OSError:
+            signature.append(0)
+    return tuple(signature)
+
+
 def get_latest_scan():
-    """En son taramayı getir"""
+    """
+    En son taramayı getir - hangi taramanın en son olduğu PID dosyaları değişmediyse kısa süre önbellekten alınır,
+    kaydın kendisi (durum dahil) her çağrıda birincil anahtarla taze okunur
+    """
+    cache_key = _pid_files_signature()
+    now = time.monotonic()
+
     try:
+        from django.db.models import Case, When, IntegerField
         from scanner.models import Scan
-        running_scan = Scan.objects.filter(status='RUN').order_by('-start_time').first()
-        if running_scan:
-            return running_scan
-        return Scan.objects.order_by('-start_time').first()
+        scans = Scan.objects.defer(*SCAN_DEFERRED_FIELDS)
+
+        scan_id = _LATEST_SCAN_CACHE['scan_id']
+        if (scan_id is not None and cache_key == _LATEST_SCAN_CACHE['key']
+                and now - _LATEST_SCAN_CACHE['time'] < LATEST_SCAN_CACHE_TTL):
+            scan = scans.filter(pk=scan_id).first()
+            if scan is not None:
+                return scan
+
+        # Çalışan tarama varsa onu, yoksa en son taramayı tek sorguda getir
+        scan = scans.annotate(
+            is_running=Case(When(status='RUN', then=1), default=0, output_field=IntegerField())
+        ).order_by('-is_running', '-start_time').first()
     except Exception:
         return None
 
+    _LATEST_SCAN_CACHE.update(key=cache_key, time=now, scan_id=scan.id if scan else None)
+    return scan
+
+
+def _scan_cache_path(scan):
+    """
+    Taramanın Parquet önbellek yolu - ad; başlangıç/bitiş zamanı, nokta sayısı ve son nokta ID'sini içerir,
+    böylece ID'si yeniden kullanılan, noktaları silinen/eklenen veya sonradan kapanan taramalar eski dosyaya düşmez
+    """
+    from django.db.models import Count, Max
+    stats = scan.points.aggregate(count=Count('id'), last_id=Max('id'))
+    start = int(scan.start_time.timestamp()) if scan.start_time else 0
+    end = int(scan.end_time.timestamp()) if scan.end_time else 0
+    return os.path.join(
+        SCAN_CACHE_DIR, f"scan_{scan.id}_{start}_{end}_{stats['count']}_{stats['last_id'] or 0}.parquet"
+    )
+
+
+def load_scan_points(scan):
+    """Tarama noktalarını DataFrame olarak getir - tamamlanmış taramalar Parquet önbelleğinden okunur"""
+    cacheable = PYARROW_AVAILABLE and scan.status != 'RUN'
+    cache_path = _scan_cache_path(scan) if cacheable else None
+
+    if cacheable and os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            logging.warning(f"Tarama önbelleği okunamadı ({cache_path}): {e}")
+
+    df = pd.DataFrame.from_records(
+        scan.points.values_list(*SCAN_POINT_FIELDS).iterator(chunk_size=5000),
+        columns=SCAN_POINT_FIELDS
+    )
+
+    if cacheable and not df.empty:
+        try:
+            os.makedirs(SCAN_CACHE_DIR, exist_ok=True)
+            # Aynı taramanın eski anahtarlı dosyaları silinir
+            for stale_path in glob.glob(os.path.join(SCAN_CACHE_DIR, f"scan_{scan.id}_*.parquet")):
+                if stale_path != cache_path:
+                    os.remove(stale_path)
+            temp_path = cache_path + '.tmp'
+            df.to_parquet(temp_path, compression='zstd', index=False)
+            os.replace(temp_path, cache_path)  # Atomic rename
+        except Exception as e:
+            logging.warning(f"Tarama önbelleği yazılamadı ({cache_path}): {e}")
+
+    return df
+
+
+def encode_dataframe(df):
+    """DataFrame'i dcc.Store için serileştir - pyarrow varsa base64 Feather, yoksa JSON"""
+    if PYARROW_AVAILABLE:
+        buffer = io.BytesIO()
+        df.reset_index(drop=True).to_feather(buffer)
+        return {'format': 'feather', 'data': base64.b64encode(buffer.getvalue()).decode('ascii')}
+    return {'format': 'json', 'data': df.to_json(orient='split')}
+
+
+def decode_dataframe(stored):
+    """encode_dataframe ile serileştirilmiş veriyi DataFrame'e geri çevir"""
+    if stored['format'] == 'feather':
+        return pd.read_feather(io.BytesIO(base64.b64decode(stored['data'])))
+    return pd.read_json(io.StringIO(stored['data']), orient='split')
+
+
+def wait_for_process_exit(pid, timeout):
+    """İşlem sonlanana kadar bekle - sabit uyku yerine çıkışta hemen döner"""
+    try:
+        psutil.Process(pid).wait(timeout=timeout)
+    except psutil.NoSuchProcess:
+        pass
+    except psutil.TimeoutExpired:
+        print(f"İşlem (PID: {pid}) {timeout} sn içinde sonlanmadı.")
+
 
 def stop_all_scripts():
     """Bilinen tüm betik PID dosyalarını kontrol eder ve çalışan işlemleri sonlandırır"""
@@ -132,7 +357,7 @@ def stop_all_scripts():
                 if pid_to_kill and is_process_running(pid_to_kill):
                     print(f"Çalışan işlem bulundu (PID: {pid_to_kill}). Durduruluyor...")
                     os.kill(pid_to_kill, signal.SIGTERM)
-                    time.sleep(0.5)
+                    wait_for_process_exit(pid_to_kill, timeout=0.5)
             except (IOError, ValueError, ProcessLookupError, Exception) as e:
                 print(f"PID dosyası işlenirken hata: {e}")
             finally:
@@ -161,7 +386,6 @@ def start_mapping_mode(h_angle, h_step, v_angle, v_step, steps_per_rev):
     """Haritalama modunu başlat"""
     try:
         stop_all_scripts()
-        time.sleep(0.5)
 
         cmd = [
             sys.executable, SENSOR_SCRIPT_PATH,
@@ -193,7 +417,6 @@ def start_autonomous_mode():
     """Otonom sürüşü başlat"""
     try:
         stop_all_scripts()
-        time.sleep(0.5)
 
         cmd = [sys.executable, AUTONOMOUS_SCRIPT_PATH]
         log_file = open("autonomous_drive_live.log", "w")
@@ -213,47 +436,77 @@ def start_autonomous_mode():
         )
 
 
-def analyze_environment_shape(fig, df_valid_input):
-    """Çevre şeklini analiz et ve kümelere ayır"""
+@functools.lru_cache(maxsize=8)
+def _cluster_points_cached(points_bytes, n):
+    """Komşuluklar BallTree ile seyrek yarıçap grafiği olarak önceden hesaplanır"""
+    points = np.frombuffer(points_bytes, dtype=np.float32).reshape(n, 2)
+
+    labels = None
+    if CUML_AVAILABLE and n > GPU_CLUSTER_MIN_POINTS:
+        try:
+            gpu_model = CumlDBSCAN(eps=CLUSTER_EPS_CM, min_samples=CLUSTER_MIN_SAMPLES, output_type='numpy')
+            labels = np.asarray(gpu_model.fit_predict(points))
+        except Exception as e:
+            logging.warning(f"cuML DBSCAN başarısız, CPU'ya dönülüyor: {e}")
+
+    if labels is None:
+        neighbors = NearestNeighbors(radius=CLUSTER_EPS_CM, algorithm='ball_tree').fit(points)
+        graph = neighbors.radius_neighbors_graph(points, mode='distance')
+        labels = DBSCAN(eps=CLUSTER_EPS_CM, min_samples=CLUSTER_MIN_SAMPLES, metric='precomputed').fit_predict(graph)
+
+    labels = labels.astype(np.int32, copy=False)
+    labels.flags.writeable = False  # Önbellekteki sonuç paylaşıldığı için salt okunur
+    return labels
+
+
+def cluster_points(points):
+    """DBSCAN kümeleme - aynı nokta kümesi için sonuç önbellekten döner"""
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    return _cluster_points_cached(points.tobytes(), len(points))
+
+
+def analyze_environment_shape(traces, df_valid_input):
+    """Çevre şeklini analiz et ve kümelere ayır - küme izleri verilen listeye eklenir"""
     df_valid = df_valid_input.copy()
     if len(df_valid) < 10:
         df_valid.loc[:, 'cluster'] = -2
         return "Analiz için yetersiz veri.", df_valid
 
     try:
-        points_all = df_valid[['y_cm', 'x_cm']].to_numpy()
-        db = DBSCAN(eps=15, min_samples=3).fit(points_all)
-        df_valid.loc[:, 'cluster'] = db.labels_
+        points_all = np.ascontiguousarray(df_valid[['y_cm', 'x_cm']].to_numpy(dtype=np.float32))
+        labels = cluster_points(points_all)
+        df_valid.loc[:, 'cluster'] = labels
 
-        unique_clusters = sorted(list(set(db.labels_)))
+        unique_clusters = np.unique(labels).tolist()
         num_actual_clusters = len(unique_clusters) - (1 if -1 in unique_clusters else 0)
 
         desc = f"{num_actual_clusters} potansiyel nesne kümesi bulundu." if num_actual_clusters > 0 else "Belirgin bir nesne kümesi bulunamadı."
-        colors = plt.cm.get_cmap('viridis', num_actual_clusters if num_actual_clusters > 0 else 1)
+        if traces is None:
+            return desc, df_valid
 
-        for k in unique_clusters:
-            cluster_points_df = df_valid[df_valid['cluster'] == k]
-            if cluster_points_df.empty:
-                continue
+        color_steps = np.linspace(0.0, 1.0, num_actual_clusters) if num_actual_clusters > 1 else [0.0]
+        colors = [unlabel_rgb(c) for c in sample_colorscale('Viridis', list(color_steps))]
 
+        # Tek geçişte gruplama - her küme için ayrı boolean maske oluşturmaz
+        for k, cluster_points_df in df_valid.groupby('cluster', sort=True):
+            k = int(k)
             points = cluster_points_df[['y_cm', 'x_cm']].to_numpy()
 
             if k == -1:
                 c, s, n = 'rgba(128,128,128,0.3)', 5, 'Gürültü/Diğer'
             else:
-                norm_k = (k / (num_actual_clusters - 1)) if num_actual_clusters > 1 else 0.0
-                rc = colors(np.clip(norm_k, 0.0, 1.0))
-                c = f'rgba({rc[0] * 255:.0f},{rc[1] * 255:.0f},{rc[2] * 255:.0f},0.9)'
+                rc = colors[min(k, len(colors) - 1)]
+                c = f'rgba({rc[0]:.0f},{rc[1]:.0f},{rc[2]:.0f},0.9)'
                 s, n = 8, f'Küme {k}'
 
-            fig.add_trace(
-                go.Scatter(
+            traces.append(
+                go.Scattergl(
                     x=points[:, 0],
                     y=points[:, 1],
                     mode='markers',
                     marker=dict(color=c, size=s),
                     name=n,
-                    customdata=[k] * len(points)
+                    customdata=np.full(len(points), k)
                 )
             )
 
@@ -263,15 +516,82 @@ def analyze_environment_shape(fig, df_valid_input):
         return f"DBSCAN kümeleme hatası: {e}", df_valid
 
 
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets ile sıralı bir çizgiyi n_out noktaya indir, seçilen indeksleri döndür"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    bucket_edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        next_start, next_end = end, bucket_edges[i + 2] if i + 2 < len(bucket_edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        areas = np.abs((x[prev] - avg_x) * (bucket_y - y[prev]) - (x[prev] - bucket_x) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(areas))
+        indices[i + 1] = prev
+
+    return indices
+
+
+def rasterize_2d_map(df):
+    """Çok büyük nokta bulutlarını Datashader ile sunucuda tek bir PNG görüntüye dönüştür.
+    (layout görüntüsü, eksen sabitleme izi) çifti döndürür; aralık sıfırsa None."""
+    y_range = (float(df['y_cm'].min()), float(df['y_cm'].max()))
+    x_range = (float(df['x_cm'].min()), float(df['x_cm'].max()))
+    if y_range[0] == y_range[1] or x_range[0] == x_range[1]:
+        return None
+
+    plot_width, plot_height = RASTER_CANVAS_SIZE
+    canvas = ds.Canvas(plot_width=plot_width, plot_height=plot_height, x_range=y_range, y_range=x_range)
+    agg = canvas.points(df, 'y_cm', 'x_cm')
+    image = tf.shade(agg, cmap=['lightblue', 'darkblue'], how='log').to_pil()
+
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    source = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    layout_image = dict(
+        source=source,
+        xref='x', yref='y',
+        x=y_range[0], y=x_range[1],
+        sizex=y_range[1] - y_range[0],
+        sizey=x_range[1] - x_range[0],
+        sizing='stretch',
+        layer='below'
+    )
+    # Eksen aralıklarını görüntü sınırlarına sabitlemek için görünmez köşe noktaları
+    corner_trace = go.Scattergl(
+        x=[y_range[0], y_range[1]],
+        y=[x_range[0], x_range[1]],
+        mode='markers',
+        marker=dict(opacity=0),
+        hoverinfo='skip',
+        showlegend=False
+    )
+    return layout_image, corner_trace
+
+
 def estimate_geometric_shape(df):
     """Geometrik şekil tahmini"""
+    from scipy.spatial import ConvexHull, QhullError
+
     if len(df) < 15:
         return "Şekil tahmini için yetersiz nokta."
 
     try:
-        hull = ConvexHull(df[['y_cm', 'x_cm']].values)
-        width = df['y_cm'].max() - df['y_cm'].min()
-        depth = df['x_cm'].max()
+        points = df[['y_cm', 'x_cm']].to_numpy(dtype=np.float64)
+        hull = ConvexHull(points)
+        mins, maxs = points.min(axis=0), points.max(axis=0)
+        width = maxs[0] - mins[0]
+        depth = maxs[1]
 
         if width < 1 or depth < 1:
             return "Algılanan şekil çok küçük."
@@ -328,6 +648,166 @@ def classify_environment_and_get_report(df):
     return env_key, report
 
 
+POINT_HOVERTEMPLATE_3D = (
+        "<b>Nokta Bilgileri</b><br><br>" +
+        "X (İleri): %{y:.1f} cm<br>" +
+        "Y (Yanal): %{x:.1f} cm<br>" +
+        "Z (Yükseklik): %{z:.1f} cm<br>" +
+        "--------------------<br>" +
+        "<b>Yatay Açı: %{customdata[0]:.1f}°</b><br>" +
+        "<b>Dikey Açı: %{customdata[1]:.1f}°</b><br>" +
+        "--------------------<br>" +
+        "<b>H-Sensör: %{customdata[2]:.1f} cm</b><br>" +
+        "<b>V-Sensör: %{customdata[3]:.1f} cm</b><br>" +
+        "<i>Tıklayarak bu noktaya git</i>" +
+        "<extra></extra>"
+)
+
+
+def to_typed_array(values, dtype='<f4'):
+    """Sayısal diziyi Plotly.js typed-array formatına ({dtype, bdata}) çevir - JSON float listesinden ~4x küçük"""
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    return {'dtype': arr.dtype.str.lstrip('<|'), 'bdata': base64.b64encode(arr.tobytes()).decode('ascii')}
+
+
+def extract_point_arrays(df):
+    """Grafiklerin ve analizlerin ortak kullandığı kolonları bir kez NumPy dizisine çevir"""
+    return {
+        'x': df['x_cm'].to_numpy(dtype=np.float64),
+        'y': df['y_cm'].to_numpy(dtype=np.float64),
+        'z': df['z_cm'].to_numpy(dtype=np.float64),
+        'distance': df['mesafe_cm'].to_numpy(dtype=np.float64),
+        'h_angle': df['derece'].to_numpy(dtype=np.float64),
+        'v_angle': df['dikey_aci'].to_numpy(dtype=np.float64),
+        'h_sensor': df['h_sensor_distance'].fillna(-1).to_numpy(dtype=np.float64),
+        'v_sensor': df['v_sensor_distance'].fillna(-1).to_numpy(dtype=np.float64),
+        'id': df['id'].to_numpy(dtype=np.float64),
+    }
+
+
+def build_3d_points_trace(arrays=None, first=True):
+    """3D nokta izi - ilk iz lejant/renk skalasını taşır, sonraki parçalar aynı gruba eklenir"""
+    if arrays is None:
+        x = y = z = color = customdata = []
+    else:
+        x, y, z = to_typed_array(arrays['y']), to_typed_array(arrays['x']), to_typed_array(arrays['z'])
+        color = to_typed_array(arrays['distance'])
+        customdata = np.column_stack((
+            arrays['h_angle'], arrays['v_angle'], arrays['h_sensor'], arrays['v_sensor'], arrays['id']
+        ))
+    return go.Scatter3d(
+        x=x, y=y, z=z,
+        mode='markers',
+        marker=dict(
+            size=3,
+            color=color,
+            colorscale='Viridis',
+            cmin=0, cmax=MAX_VALID_DISTANCE_CM,
+            showscale=first,
+            colorbar_title='Mesafe (cm)',
+            line=dict(width=0)
+        ),
+        customdata=customdata,
+        hovertemplate=POINT_HOVERTEMPLATE_3D,
+        name='Tarama Noktaları',
+        legendgroup='points',
+        showlegend=first
+    )
+
+
+def build_3d_sensor_trace():
+    """3D haritada sensörün başlangıç konumunu gösteren iz"""
+    return go.Scatter3d(
+        x=[0], y=[0], z=[0],
+        mode='markers',
+        marker=dict(size=8, color='red', symbol='diamond'),
+        name='Sensör (Başlangıç)',
+        hovertemplate="<b>Robot Başlangıç Pozisyonu</b><extra></extra>"
+    )
+
+
+def build_polar_points_trace(arrays=None, first=True):
+    """Polar nokta izi - parçalar aynı renk aralığını ve lejant grubunu paylaşır"""
+    if arrays is None:
+        r = theta = []
+    else:
+        r, theta = to_typed_array(arrays['distance']), to_typed_array(arrays['h_angle'])
+    return go.Scatterpolargl(
+        r=r, theta=theta,
+        mode='markers',
+        marker=dict(size=5, color=r, colorscale='Viridis', cmin=0, cmax=MAX_VALID_DISTANCE_CM, showscale=first),
+        name='Mesafeler',
+        legendgroup='points',
+        showlegend=first,
+        hovertemplate="Açı: %{theta:.1f}°<br>Mesafe: %{r:.1f} cm<extra></extra>"
+    )
+
+
+def build_3d_base_figure():
+    """3D harita iskeleti - izler bir kez oluşturulur, callback yalnızca verileri Patch ile günceller"""
+    return go.Figure(
+        data=[build_3d_points_trace(), build_3d_sensor_trace()],
+        layout=dict(
+            title='Veri Bekleniyor...',
+            annotations=[dict(text="Tarama başlatın.", showarrow=False, font=dict(size=16))],
+            margin=dict(l=0, r=0, b=0, t=40),
+            scene=dict(
+                xaxis_title='Y Ekseni (cm)',
+                yaxis_title='X Ekseni (cm)',
+                zaxis_title='Z Ekseni (cm)',
+                aspectmode='data'
+            ),
+            clickmode='event+select',
+            uirevision='keep'
+        )
+    )
+
+
+def build_polar_base_figure():
+    """Polar grafik iskeleti - tek iz, callback yalnızca r/theta dizilerini Patch ile günceller"""
+    return go.Figure(
+        data=[build_polar_points_trace()],
+        layout=dict(
+            title='Polar Grafik',
+            polar=dict(radialaxis=dict(title='Mesafe (cm)')),
+            margin=dict(l=40, r=40, b=40, t=40),
+            uirevision='keep'
+        )
+    )
+
+
+def patch_3d_figure(title, arrays=None, hint=None):
+    """3D haritayı baştan kuran Patch - önceki taramadan kalan parça izleri de silinir"""
+    patch = Patch()
+    patch['layout']['title'] = {'text': title}
+    patch['layout']['annotations'] = [dict(text=hint, showarrow=False, font=dict(size=16))] if hint else []
+    patch['data'] = [build_3d_points_trace(arrays), build_3d_sensor_trace()]
+    return patch
+
+
+def patch_polar_figure(arrays=None):
+    """Polar grafiği baştan kuran Patch"""
+    patch = Patch()
+    patch['data'] = [build_polar_points_trace(arrays)]
+    return patch
+
+
+def append_points_patch(trace):
+    """Yalnızca yeni noktaları içeren izi figüre ekleyen Patch - gönderilen veri O(Δ)"""
+    patch = Patch()
+    patch['data'].append(trace)
+    return patch
+
+
+MAP_2D_LAYOUT = dict(
+    title='2D Harita (Üstten Görünüm)',
+    xaxis=dict(title='Y Ekseni (cm)'),
+    yaxis=dict(title='X Ekseni (cm)', scaleanchor="x", scaleratio=1),
+    margin=dict(l=20, r=20, b=20, t=40),
+    uirevision='keep'
+)
+
+
 # --- ARAYÜZ BİLEŞENLERİ (LAYOUT) ---
 control_panel = dbc.Card([
     dbc.CardHeader([html.I(className="fa-solid fa-gears me-2"), "Sistem Kontrolü"]),
@@ -521,7 +1001,8 @@ estimation_card = dbc.Card([
 
 visualization_tabs = dbc.Tabs([
     dbc.Tab(
-        dcc.Graph(id='scan-map-graph-3d', style={'height': '75vh'}, config={'displayModeBar': True}),
+        dcc.Graph(id='scan-map-graph-3d', figure=build_3d_base_figure(), style={'height': '75vh'},
+                  config={'displayModeBar': True}),
         label="3D Harita",
         tab_id="tab-3d"
     ),
@@ -531,7 +1012,7 @@ visualization_tabs = dbc.Tabs([
         tab_id="tab-2d"
     ),
     dbc.Tab(
-        dcc.Graph(id='polar-graph', style={'height': '75vh'}),
+        dcc.Graph(id='polar-graph', figure=build_polar_base_figure(), style={'height': '75vh'}),
         label="Polar Grafik",
         tab_id="tab-polar"
     ),
@@ -601,8 +1082,17 @@ app.layout = html.Div(
     dcc.Store(id='latest-scan-object-store'),
     dcc.Store(id='latest-scan-points-store'),
     dcc.Store(id='clustered-data-store'),
-    dcc.Interval(id='interval-component-main', interval=2500, n_intervals=0, disabled=True),
+    dcc.Store(id='graph-render-state'),
+    dcc.Store(id='scan-event-store'),
+    dcc.Store(id='scan-delta-store'),
+    # Tarama olay akışı (SSE) kapalı mı: başlat/durdur butonları yazar, EventSource bu değere göre açılıp kapanır
+    dcc.Store(id='scan-stream-disabled', data=True),
     dcc.Interval(id='interval-component-system', interval=3000, n_intervals=0),
+    # Yalnızca arka plandaki harita analizi sürerken açıktır
+    dcc.Interval(id='interval-component-analysis', interval=1000, n_intervals=0, disabled=True),
+    dcc.Store(id='analysis-result-key'),
+    # Bu oturumda ekrandaki veri tablosunun oluşturulduğu nokta verisinin anahtarı
+    dcc.Store(id='datatable-render-key'),
     dbc.Modal(
         [
             dbc.ModalHeader(dbc.ModalTitle(id="modal-title")),
@@ -618,31 +1108,117 @@ app.layout = html.Div(
 
 # --- CALLBACK FONKSİYONLARI ---
 
-# 1. Periyodik Veri Çekme
+# 0. Tarama Olay Akışı (SSE) - tarama aktifken EventSource açılır, durunca kapanır.
+# Sunucu yalnızca istemcide olmayan noktaları gönderir; olaylar doğrudan scan-delta-store'a yazılır
+app.clientside_callback(
+    """
+    function(disabled, scanJson, pointsJson) {
+        if (disabled) {
+            if (window.dreampiScanEvents) {
+                window.dreampiScanEvents.close();
+                window.dreampiScanEvents = null;
+            }
+            return window.dash_clientside.no_update;
+        }
+        if (!window.dreampiScanEvents) {
+            var scanId = 0, lastId = 0;
+            if (scanJson && pointsJson) {
+                var points = JSON.parse(pointsJson);
+                var idCol = points.columns.indexOf('id');
+                scanId = JSON.parse(scanJson).id;
+                points.data.forEach(function(row) { lastId = Math.max(lastId, row[idCol]); });
+            }
+            window.dreampiScanEvents = new EventSource('%s?scan_id=' + scanId + '&last_id=' + lastId);
+            window.dreampiScanEvents.onmessage = function(event) {
+                window.dash_clientside.set_props('scan-delta-store', {data: JSON.parse(event.data)});
+            };
+        }
+        return window.dash_clientside.no_update;
+    }
+    """ % SCAN_EVENTS_URL,
+    Output('dummy-clientside-output', 'children'),
+    Input('scan-stream-disabled', 'data'),
+    State('latest-scan-object-store', 'data'),
+    State('latest-scan-points-store', 'data')
+)
+
+# Yeni noktalar tarayıcıda nokta deposuna eklenir; tarama veya durumu değiştiğinde scan-event-store güncellenir
+# ve sunucu tarama kaydını (tarama bittiyse noktalarla birlikte) yeniden yükler
+app.clientside_callback(
+    """
+    function(delta, pointsJson, scanState, scanJson) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!delta) {
+            return [noUpdate, noUpdate];
+        }
+        var previous = scanState;
+        if (!previous && scanJson) {
+            var scan = JSON.parse(scanJson);
+            previous = {scan_id: scan.id, status: scan.status};
+        }
+        var sameScan = previous && previous.scan_id === delta.scan_id;
+
+        var newPoints = noUpdate;
+        if (!sameScan || (delta.data.length && !pointsJson)) {
+            // Yeni taramanın ilk olayı noktaları baştan içerir
+            newPoints = delta.data.length ? JSON.stringify({
+                columns: delta.columns, index: delta.data.map(function(_, i) { return i; }), data: delta.data
+            }) : null;
+        } else if (delta.data.length) {
+            var points = JSON.parse(pointsJson);
+            var offset = points.data.length;
+            points.data = points.data.concat(delta.data);
+            points.index = points.index.concat(delta.data.map(function(_, i) { return offset + i; }));
+            newPoints = JSON.stringify(points);
+        }
+
+        var newState = noUpdate;
+        if (!scanState || !sameScan || previous.status !== delta.status) {
+            newState = {scan_id: delta.scan_id, status: delta.status};
+        }
+        return [newPoints, newState];
+    }
+    """,
+    [Output('latest-scan-points-store', 'data', allow_duplicate=True),
+     Output('scan-event-store', 'data')],
+    Input('scan-delta-store', 'data'),
+    [State('latest-scan-points-store', 'data'),
+     State('scan-event-store', 'data'),
+     State('latest-scan-object-store', 'data')],
+    prevent_initial_call=True
+)
+
+
+# 1. Veri Çekme (sayfa açılışında ve tarama/durum değiştiğinde)
 @app.callback(
     [Output('latest-scan-object-store', 'data'),
      Output('latest-scan-points-store', 'data')],
-    Input('interval-component-main', 'n_intervals')
+    Input('scan-event-store', 'data')
 )
-def update_data_stores(n):
-    """Veritabanından en son taramayı çek"""
+def update_data_stores(scan_event):
+    """
+    Veritabanından en son taramayı çek - sayfa açılışında ve tarama/durum değiştiğinde. Süren taramanın
+    noktaları SSE olaylarıyla tarayıcıda biriktirildiği için o durumda yalnızca tarama kaydı yenilenir.
+    """
     from django.forms.models import model_to_dict
+    from scanner.models import Scan
     try:
-        scan = get_latest_scan()
+        # Olay hangi taramaya aitse o yüklenir (tarayıcıdaki noktalarla aynı tarama)
+        if scan_event:
+            scan = Scan.objects.defer(*SCAN_DEFERRED_FIELDS).filter(pk=scan_event['scan_id']).first()
+        else:
+            scan = get_latest_scan()
         if not scan:
             return no_update, no_update
 
-        scan_json = json.dumps(model_to_dict(scan), default=str)
-
-        points_qs = scan.points.all().values(
-            'id', 'x_cm', 'y_cm', 'z_cm', 'derece', 'dikey_aci', 'mesafe_cm',
-            'h_sensor_distance', 'v_sensor_distance', 'hiz_cm_s', 'timestamp'
-        )
+        scan_json = json.dumps(model_to_dict(scan, exclude=SCAN_DEFERRED_FIELDS), default=str)
+        if scan_event and scan.status == 'RUN':
+            return scan_json, no_update
 
-        if not points_qs.exists():
+        df_pts = load_scan_points(scan)
+        if df_pts.empty:
             return scan_json, None
 
-        df_pts = pd.DataFrame(list(points_qs))
         df_pts['timestamp'] = pd.to_datetime(df_pts['timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S')
         points_json = df_pts.to_json(orient='split')
 
@@ -667,7 +1243,7 @@ def toggle_mode_parameters(selected_mode):
     [Output("start-button", "children"),
      Output("start-button", "disabled"),
      Output("stop-button", "disabled"),
-     Output("interval-component-main", "disabled")],
+     Output("scan-stream-disabled", "data")],
     [Input("start-button", "n_clicks"),
      Input("stop-button", "n_clicks")],
     [State("operation-mode", "value"),
@@ -701,13 +1277,10 @@ def handle_start_stop_operations(start_clicks, stop_clicks, mode, h_angle, h_ste
     [Output('ai-model-dropdown', 'options'),
      Output('ai-model-dropdown', 'disabled'),
      Output('ai-model-dropdown', 'placeholder')],
-    Input('interval-component-main', 'n_intervals')
+    Input('operation-mode', 'value')
 )
-def populate_ai_model_dropdown(n):
-    """AI model listesini doldur"""
-    if n > 0:
-        raise PreventUpdate
-
+def populate_ai_model_dropdown(mode):
+    """AI model listesini doldur (sayfa açılışında ve mod değiştiğinde)"""
     options = get_ai_model_options()
     if options and not options[0].get('disabled'):
         return options, False, "Analiz için bir AI modeli seçin..."
@@ -729,24 +1302,14 @@ def update_system_card(n):
     running_scripts = []
 
     # Haritalama scripti kontrol
-    if os.path.exists(SENSOR_SCRIPT_PID_FILE):
-        try:
-            with open(SENSOR_SCRIPT_PID_FILE, 'r') as f:
-                pid = int(f.read().strip())
-            if is_process_running(pid):
-                running_scripts.append(f"Haritalama (PID:{pid})")
-        except:
-            pass
+    pid = read_pid_file(SENSOR_SCRIPT_PID_FILE)
+    if is_process_running(pid):
+        running_scripts.append(f"Haritalama (PID:{pid})")
 
     # Otonom script kontrol
-    if os.path.exists(AUTONOMOUS_SCRIPT_PID_FILE):
-        try:
-            with open(AUTONOMOUS_SCRIPT_PID_FILE, 'r') as f:
-                pid = int(f.read().strip())
-            if is_process_running(pid):
-                running_scripts.append(f"Otonom (PID:{pid})")
-        except:
-            pass
+    pid = read_pid_file(AUTONOMOUS_SCRIPT_PID_FILE)
+    if is_process_running(pid):
+        running_scripts.append(f"Otonom (PID:{pid})")
 
     # Durum metni ve rengi
     if running_scripts:
@@ -756,9 +1319,10 @@ def update_system_card(n):
         status_text = "Beklemede"
         status_class = "text-warning"
 
-    # CPU ve RAM kullanımı
-    cpu = psutil.cpu_percent(interval=0.1)
-    ram = psutil.virtual_memory().percent
+    # CPU ve RAM kullanımı (arka plan örnekleyicisinden)
+    _ensure_system_stats_sampler()
+    cpu = SYSTEM_STATS['cpu']
+    ram = SYSTEM_STATS['ram']
 
     return status_text, status_class, cpu, f"{cpu:.1f}%", ram, f"{ram:.1f}%"
 
@@ -789,7 +1353,7 @@ def update_realtime_values(points_json, scan_json):
         return default_return
 
     # En son noktayı al
-    point = df.sort_values(by='id', ascending=False).iloc[0]
+    point = df.loc[df['id'].idxmax()]
 
     h_angle = f"{point.get('derece', 0.0):.1f}°"
     v_angle = f"{point.get('dikey_aci', 0.0):.1f}°"
@@ -801,8 +1365,7 @@ def update_realtime_values(points_json, scan_json):
     avg_dist = f"{point.get('mesafe_cm', 0.0):.1f} cm"
 
     # Maksimum mesafe
-    df_valid = df[df['mesafe_cm'] > 0]
-    max_dist_val = df_valid['mesafe_cm'].max() if not df_valid.empty else None
+    max_dist_val = df['mesafe_cm'].where(df['mesafe_cm'] > 0).max()
     max_dist = f"{max_dist_val:.1f} cm" if pd.notnull(max_dist_val) else "-- cm"
 
     return h_angle, v_angle, h_sensor, v_sensor, avg_dist, max_dist
@@ -812,45 +1375,85 @@ def update_realtime_values(points_json, scan_json):
 @app.callback(
     Output('download-csv', 'data'),
     Input('export-csv-button', 'n_clicks'),
-    State('latest-scan-points-store', 'data'),
+    State('latest-scan-object-store', 'data'),
     prevent_initial_call=True
 )
-def export_csv_callback(n_clicks, points_json):
-    """CSV dosyası oluştur ve indir"""
-    if not points_json:
+def export_csv_callback(n_clicks, scan_json):
+    """CSV dosyası oluştur ve indir - satırlar veritabanı imlecinden doğrudan yazılır"""
+    if not scan_json:
         return dcc.send_data_frame(pd.DataFrame().to_csv, "veri_yok.csv", index=False)
 
-    df = pd.read_json(io.StringIO(points_json), orient='split')
-    return dcc.send_data_frame(df.to_csv, "tarama_verisi.csv", index=False)
+    from django.db import connection
+    from scanner.models import ScanPoint
+
+    scan_id = json.loads(scan_json).get('id')
+    meta = ScanPoint._meta
+    columns = ', '.join(meta.get_field(name).column for name in SCAN_POINT_FIELDS)
+    query = (
+        f"SELECT {columns} FROM {meta.db_table} "
+        f"WHERE {meta.get_field('scan').column} = %s ORDER BY {meta.pk.column}"
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with connection.cursor() as cursor:
+        cursor.execute(query, [scan_id])
+        writer.writerow(SCAN_POINT_FIELDS)
+        while True:
+            rows = cursor.fetchmany(5000)
+            if not rows:
+                break
+            writer.writerows(rows)
+
+    return dcc.send_string(buffer.getvalue(), "tarama_verisi.csv")
 
 
 # 8. Excel Export
 @app.callback(
     Output('download-excel', 'data'),
     Input('export-excel-button', 'n_clicks'),
-    [State('latest-scan-object-store', 'data'),
-     State('latest-scan-points-store', 'data')],
+    State('latest-scan-object-store', 'data'),
     prevent_initial_call=True
 )
-def export_excel_callback(n_clicks, scan_json, points_json):
-    """Excel dosyası oluştur ve indir"""
+def export_excel_callback(n_clicks, scan_json):
+    """Excel dosyası oluştur ve indir - satırlar constant_memory modunda akış halinde yazılır"""
     if not scan_json:
         return dcc.send_bytes(b"", "tarama_yok.xlsx")
 
+    from scanner.models import ScanPoint
+
     scan = json.loads(scan_json)
     scan_id = scan.get('id', 'bilinmeyen')
 
+    # Periyodik depoda bulunmayan alanlar (örn. AI yorumu) için taramanın tamamını oku
+    try:
+        from django.forms.models import model_to_dict
+        from scanner.models import Scan
+        scan = json.loads(json.dumps(model_to_dict(Scan.objects.get(id=scan_id)), default=str))
+    except Exception as e:
+        logging.warning(f"Tarama #{scan_id} detayları okunamadı: {e}")
+
     output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+    # constant_memory: her satır yazıldıktan sonra diske aktarılır, bellek kullanımı tarama boyutundan bağımsızdır.
+    # Bu modda hücreler satır sırasıyla yazılmalı ve autofit() kullanılamaz.
+    with pd.ExcelWriter(output, engine='xlsxwriter',
+                        engine_kwargs={'options': {'constant_memory': True}}) as writer:
         # Tarama bilgileri sayfası
         pd.DataFrame([scan]).to_excel(writer, sheet_name='Tarama Bilgileri', index=False)
-        writer.sheets['Tarama Bilgileri'].autofit()
+        writer.sheets['Tarama Bilgileri'].set_column(0, len(scan) - 1, 22)
 
         # Nokta verileri sayfası
-        if points_json:
-            points_df = pd.read_json(io.StringIO(points_json), orient='split')
-            points_df.to_excel(writer, sheet_name='Nokta Verileri', index=False)
-            writer.sheets['Nokta Verileri'].autofit()
+        worksheet = writer.book.add_worksheet('Nokta Verileri')
+        worksheet.set_column(0, len(SCAN_POINT_FIELDS) - 1, 18)
+        worksheet.write_row(0, 0, SCAN_POINT_FIELDS)
+
+        timestamp_idx = SCAN_POINT_FIELDS.index('timestamp')
+        rows = ScanPoint.objects.filter(scan_id=scan_id).order_by('id').values_list(*SCAN_POINT_FIELDS)
+        for row_idx, row in enumerate(rows.iterator(chunk_size=5000), start=1):
+            row = list(row)
+            if row[timestamp_idx] is not None:
+                row[timestamp_idx] = row[timestamp_idx].strftime('%Y-%m-%d %H:%M:%S')
+            worksheet.write_row(row_idx, 0, row)
 
     output.seek(0)
     return dcc.send_bytes(output.getvalue(), f"tarama_detaylari_id_{scan_id}.xlsx")
@@ -858,18 +1461,28 @@ def export_excel_callback(n_clicks, scan_json, points_json):
 
 # 9. Veri Tablosu (İKİ SENSÖR KOLONLU)
 @app.callback(
-    Output('tab-content-datatable', 'children'),
+    [Output('tab-content-datatable', 'children'),
+     Output('datatable-render-key', 'data')],
     [Input('visualization-tabs-main', 'active_tab'),
-     Input('latest-scan-points-store', 'data')]
+     Input('latest-scan-points-store', 'data')],
+    [State('latest-scan-object-store', 'data'),
+     State('datatable-render-key', 'data')]
 )
-def render_and_update_data_table(active_tab, points_json):
+def render_and_update_data_table(active_tab, points_json, scan_json, rendered_key):
     """Veri tablosunu oluştur - İKİ SENSÖR KOLONU DAHİL"""
     if active_tab != "tab-datatable" or not points_json:
-        return None
+        return None, None
+
+    # Tarama içinde noktalar yalnızca eklendiğinden (tarama id, JSON uzunluğu) veriyi O(1) ayırt eder.
+    # Anahtar oturumun kendi deposunda tutulur; yalnızca nokta deposu tetiklediyse ve değişmediyse tablo ekranda kalır
+    render_key = f"{json.loads(scan_json).get('id') if scan_json else None}:{len(points_json)}"
+    triggered = [t['prop_id'] for t in dash.callback_context.triggered]
+    if render_key == rendered_key and triggered == ['latest-scan-points-store.data']:
+        return no_update, no_update
 
     df = pd.read_json(io.StringIO(points_json), orient='split')
     if df.empty:
-        return dbc.Alert("Görüntülenecek veri noktası bulunamadı.", color="warning")
+        return dbc.Alert("Görüntülenecek veri noktası bulunamadı.", color="warning"), render_key
 
     column_definitions = {
         'id': "Nokta ID",
@@ -897,7 +1510,7 @@ def render_and_update_data_table(active_tab, points_json):
             col_name = column_definitions.get(col_id, col_id.replace("_", " ").title())
             final_columns.append({"name": col_name, "id": col_id})
 
-    return dash_table.DataTable(
+    table = dash_table.DataTable(
         data=df.to_dict('records'),
         columns=final_columns,
         page_size=20,
@@ -949,146 +1562,80 @@ def render_and_update_data_table(active_tab, points_json):
         ]
     )
 
+    return table, render_key
 
-# 10. Tüm Grafikleri Güncelle
-@app.callback(
-    [Output('scan-map-graph-3d', 'figure'),
-     Output('scan-map-graph-2d', 'figure'),
-     Output('polar-graph', 'figure'),
-     Output('environment-estimation-text', 'children'),
-     Output('clustered-data-store', 'data'),
-     Output('calculated-area', 'children'),
-     Output('perimeter-length', 'children'),
-     Output('max-width', 'children'),
-     Output('max-depth', 'children')],
-    [Input('latest-scan-object-store', 'data'),
-     Input('latest-scan-points-store', 'data')]
-)
-def update_all_graphs_and_analytics(scan_json, points_json):
-    """Tüm grafikleri ve analizleri güncelle"""
-    empty_fig = go.Figure(
-        layout=dict(
-            title='Veri Bekleniyor...',
-            annotations=[dict(
-                text="Tarama başlatın.",
-                showarrow=False,
-                font=dict(size=16)
-            )]
-        )
-    )
-    default_return = (empty_fig,) * 3 + (html.Div("Analiz için veri bekleniyor."), None) + ("--",) * 4
-
-    if not scan_json or not points_json:
-        return default_return
 
-    scan_data = json.loads(scan_json)
-    scan_id = scan_data.get('id', 'Bilinmiyor')
+def parse_valid_points(points_json):
+    """Nokta JSON'unu çöz; tüm veriyi ve grafiklerde kullanılacak geçerli noktaları döndür"""
     df = pd.read_json(io.StringIO(points_json), orient='split')
-
     if df.empty:
-        empty_fig = go.Figure(layout=dict(title=f'Tarama #{scan_id} için Nokta Verisi Yok...'))
-        return (empty_fig,) * 3 + (html.Div("Analiz için veri bekleniyor."), None) + ("--",) * 4
-
-    df_valid = df[(df['mesafe_cm'] > 0.1) & (df['mesafe_cm'] < 400.0)].copy()
+        return df, df
+    df_valid = df[(df['mesafe_cm'] > 0.1) & (df['mesafe_cm'] < MAX_VALID_DISTANCE_CM)].copy()
     df_valid.dropna(subset=['x_cm', 'y_cm', 'z_cm', 'derece', 'dikey_aci'], inplace=True)
+    return df, df_valid
 
-    fig_3d = go.Figure(layout=dict(
-        title=f'3D Tarama Görüntüsü - Tarama ID: {scan_id}',
-        margin=dict(l=0, r=0, b=0, t=40)
-    ))
-
-    fig_2d = go.Figure(layout=dict(
-        title='2D Harita (Üstten Görünüm)',
-        xaxis_title='Y Ekseni (cm)',
-        yaxis_title='X Ekseni (cm)',
-        margin=dict(l=20, r=20, b=20, t=40)
-    ))
 
-    fig_polar = go.Figure(layout=dict(
-        title='Polar Grafik',
-        polar=dict(radialaxis=dict(title='Mesafe (cm)')),
-        margin=dict(l=40, r=40, b=40, t=40)
-    ))
+def waiting_figure(title='Veri Bekleniyor...', hint="Tarama başlatın."):
+    """Veri yokken gösterilen boş 2D figür"""
+    annotations = [dict(text=hint, showarrow=False, font=dict(size=16))] if hint else []
+    return go.Figure(layout=dict(title=title, annotations=annotations, uirevision='keep'))
 
-    analysis_report_component = html.Div("Analiz için yetersiz veri.")
-    store_data = None
-    area, perim, width, depth = "-- cm²", "-- cm", "-- cm", "-- cm"
-
-    if len(df_valid) > 10:
-        # --- 3D GRAFİK ---
-        custom_data_3d = np.stack((
-            df_valid['derece'],
-            df_valid['dikey_aci'],
-            df_valid['h_sensor_distance'].fillna(-1),
-            df_valid['v_sensor_distance'].fillna(-1),
-            df_valid['id']
-        ), axis=-1)
-
-        fig_3d.add_trace(go.Scatter3d(
-            x=df_valid['y_cm'],
-            y=df_valid['x_cm'],
-            z=df_valid['z_cm'],
-            mode='markers',
-            marker=dict(
-                size=3,
-                color=df_valid['mesafe_cm'],
-                colorscale='Viridis',
-                showscale=True,
-                colorbar_title='Mesafe (cm)',
-                line=dict(width=0)
-            ),
-            customdata=custom_data_3d,
-            hovertemplate=(
-                    "<b>Nokta Bilgileri</b><br><br>" +
-                    "X (İleri): %{y:.1f} cm<br>" +
-                    "Y (Yanal): %{x:.1f} cm<br>" +
-                    "Z (Yükseklik): %{z:.1f} cm<br>" +
-                    "--------------------<br>" +
-                    "<b>Yatay Açı: %{customdata[0]:.1f}°</b><br>" +
-                    "<b>Dikey Açı: %{customdata[1]:.1f}°</b><br>" +
-                    "--------------------<br>" +
-                    "<b>H-Sensör: %{customdata[2]:.1f} cm</b><br>" +
-                    "<b>V-Sensör: %{customdata[3]:.1f} cm</b><br>" +
-                    "<i>Tıklayarak bu noktaya git</i>" +
-                    "<extra></extra>"
-            ),
-            name='Tarama Noktaları'
-        ))
 
-        fig_3d.add_trace(go.Scatter3d(
-            x=[0], y=[0], z=[0],
-            mode='markers',
-            marker=dict(size=8, color='red', symbol='diamond'),
-            name='Sensör (Başlangıç)',
-            hovertemplate="<b>Robot Başlangıç Pozisyonu</b><extra></extra>"
-        ))
+def compute_map_and_analytics(scan_id, points_json):
+    """2D harita, kümeleme, ortam raporu ve ölçümleri hesapla (arka plan iş parçacığında çalışır)"""
+    df, df_valid = parse_valid_points(points_json)
+    if df.empty:
+        return (
+            (waiting_figure(f'Tarama #{scan_id} için Nokta Verisi Yok...', hint=None),
+             html.Div("Analiz için veri bekleniyor."), None) + ("--",) * 4
+        )
 
-        fig_3d.update_layout(
-            scene=dict(
-                xaxis_title='Y Ekseni (cm)',
-                yaxis_title='X Ekseni (cm)',
-                zaxis_title='Z Ekseni (cm)',
-                aspectmode='data'
-            ),
-            clickmode='event+select'
+    if len(df_valid) <= 10:
+        return (
+            (go.Figure(layout=MAP_2D_LAYOUT), html.Div("Analiz için yetersiz veri."), None) +
+            ("-- cm²", "-- cm", "-- cm", "-- cm")
         )
 
-        # --- 2D GRAFİK ---
-        desc, df_clustered = analyze_environment_shape(fig_2d, df_valid)
+    arrays = extract_point_arrays(df_valid)
 
-        fig_2d.add_trace(go.Scatter(
-            x=[0], y=[0],
-            mode='markers',
-            marker=dict(size=12, color='red', symbol='circle'),
-            name='Sensör'
-        ))
+    # --- 2D GRAFİK --- (tüm izler toplanıp figür tek seferde oluşturulur)
+    traces_2d = []
+    layout_2d = MAP_2D_LAYOUT
 
-        df_sorted_2d = df_valid.sort_values(by='derece')
-        poly_x = df_sorted_2d['y_cm'].tolist()
-        poly_y = df_sorted_2d['x_cm'].tolist()
-        fig_2d.add_trace(go.Scatter(
-            x=[0] + poly_x + [0],
-            y=[0] + poly_y + [0],
+    raster = None
+    if ds is not None and len(df_valid) > RASTERIZE_POINT_THRESHOLD:
+        try:
+            raster = rasterize_2d_map(df_valid)
+        except Exception as e:
+            logging.warning(f"2D harita rasterleştirilemedi: {e}")
+
+    if raster is not None:
+        layout_image, corner_trace = raster
+        layout_2d = {**MAP_2D_LAYOUT, 'images': [layout_image]}
+        traces_2d.append(corner_trace)
+
+    desc, df_clustered = analyze_environment_shape(None if raster else traces_2d, df_valid)
+
+    traces_2d.append(go.Scattergl(
+        x=[0], y=[0],
+        mode='markers',
+        marker=dict(size=12, color='red', symbol='circle'),
+        name='Sensör'
+    ))
+
+    if raster is None:
+        order = np.argsort(arrays['h_angle'], kind='stable')
+        outline_x = arrays['y'][order]
+        outline_y = arrays['x'][order]
+        keep = lttb_indices(outline_x, outline_y, MAX_LINE_POINTS)
+        n = len(keep)
+        poly_x = np.zeros(n + 2)
+        poly_y = np.zeros(n + 2)
+        poly_x[1:-1] = outline_x[keep]
+        poly_y[1:-1] = outline_y[keep]
+        traces_2d.append(go.Scattergl(
+            x=poly_x,
+            y=poly_y,
             mode='lines',
             fill='toself',
             fillcolor='rgba(255,0,0,0.15)',
@@ -1096,40 +1643,161 @@ def update_all_graphs_and_analytics(scan_json, points_json):
             name='Taranan Sektör'
         ))
 
-        fig_2d.update_layout(yaxis=dict(scaleanchor="x", scaleratio=1))
-
-        # --- POLAR GRAFİK ---
-        fig_polar.add_trace(go.Scatterpolar(
-            r=df_valid['mesafe_cm'],
-            theta=df_valid['derece'],
-            mode='markers',
-            marker=dict(
-                size=5,
-                color=df_valid['mesafe_cm'],
-                colorscale='Viridis',
-                showscale=True
-            ),
-            name='Mesafeler',
-            hovertemplate="Açı: %{theta:.1f}°<br>Mesafe: %{r:.1f} cm<extra></extra>"
-        ))
+    fig_2d = go.Figure(data=traces_2d, layout=layout_2d)
 
-        # --- ANALİZLER ---
-        env_key, analysis_report_component = classify_environment_and_get_report(df_valid)
+    # --- ANALİZLER ---
+    env_key, analysis_report_component = classify_environment_and_get_report(df_valid)
 
-        try:
-            hull = ConvexHull(df_valid[['y_cm', 'x_cm']].values)
-            area = f"{hull.volume:.1f} cm²"
-            perim = f"{hull.area:.1f} cm"
-        except:
-            area = "Hesaplanamadı"
-            perim = "Hesaplanamadı"
+    try:
+        from scipy.spatial import ConvexHull
+        hull = ConvexHull(np.column_stack((arrays['y'], arrays['x'])))
+        area = f"{hull.volume:.1f} cm²"
+        perim = f"{hull.area:.1f} cm"
+    except:
+        area = "Hesaplanamadı"
+        perim = "Hesaplanamadı"
+
+    width = f"{np.ptp(arrays['y']):.1f} cm"
+    depth = f"{arrays['x'].max():.1f} cm"
+
+    store_data = encode_dataframe(df_clustered)
+
+    return fig_2d, analysis_report_component, store_data, area, perim, width, depth
+
+
+# Ağır analiz tek işçili havuzda çalışır; callback yalnızca en son biten sonucu okur
+_ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dreampi-analysis')
+_ANALYSIS_LOCK = threading.Lock()
+# Tarama başına analiz durumu: aynı taramayı gösteren oturumlar sonucu paylaşır, farklı taramalar birbirini ezmez
+_ANALYSIS_STATES = {}
+# Bellekte tutulan en fazla tarama durumu sayısı (en eskisi atılır)
+ANALYSIS_STATE_LIMIT = 8
+# Başarısız bir analiz aynı veriyle en fazla bu kadar kez yeniden denenir
+ANALYSIS_MAX_RETRIES = 2
+
+
+def _analysis_state(scan_id):
+    """Taramanın analiz durumunu getir/oluştur (_ANALYSIS_LOCK altında çağrılır)"""
+    state = _ANALYSIS_STATES.get(scan_id)
+    if state is None:
+        if len(_ANALYSIS_STATES) >= ANALYSIS_STATE_LIMIT:
+            idle = [sid for sid, st in _ANALYSIS_STATES.items() if st['future'] is None]
+            if idle:
+                del _ANALYSIS_STATES[idle[0]]
+        state = _ANALYSIS_STATES[scan_id] = {
+            'future': None, 'submitted_key': None, 'result': None, 'result_key': None,
+            'failed_key': None, 'failures': 0,
+        }
+    return state
+
+
+def poll_map_and_analytics(key, scan_id, points_json):
+    """
+    Taramanın biten analizini topla, o tarama için hesap sürmüyorsa en güncel veriyle yenisini başlat.
+    Hesap sürerken gelen ara veriler atlanır (son sonuç kazanır); başarısız hesap sonraki yoklamada yeniden
+    denenir. (sonuç, sonuç anahtarı, meşgul) döndürür.
+    """
+    with _ANALYSIS_LOCK:
+        state = _analysis_state(scan_id)
+        future = state['future']
+        if future is not None and future.done():
+            state['future'] = None
+            try:
+                state['result'] = future.result()
+                state['result_key'] = state['submitted_key']
+            except Exception as e:
+                logging.error(f"Harita analizi başarısız (Tarama #{scan_id}): {e}")
+                # Anahtar temizlenir ki aynı veri yeniden gönderilsin (sınırlı sayıda)
+                if state['failed_key'] == state['submitted_key']:
+                    state['failures'] += 1
+                else:
+                    state['failed_key'], state['failures'] = state['submitted_key'], 1
+                if state['failures'] <= ANALYSIS_MAX_RETRIES:
+                    state['submitted_key'] = None
+
+        if state['future'] is None and state['submitted_key'] != key:
+            state['future'] = _ANALYSIS_EXECUTOR.submit(compute_map_and_analytics, scan_id, points_json)
+            state['submitted_key'] = key
+
+        return state['result'], state['result_key'], state['future'] is not None
+
+
+# 10. 3D ve Polar Grafikleri Güncelle
+@app.callback(
+    [Output('scan-map-graph-3d', 'figure'),
+     Output('polar-graph', 'figure'),
+     Output('graph-render-state', 'data')],
+    [Input('latest-scan-object-store', 'data'),
+     Input('latest-scan-points-store', 'data')],
+    State('graph-render-state', 'data')
+)
+def update_point_graphs(scan_json, points_json, render_state):
+    """3D ve polar grafikleri güncelle - aynı taramada yalnızca yeni noktalar eklenir"""
+    if not scan_json or not points_json:
+        return patch_3d_figure('Veri Bekleniyor...', hint="Tarama başlatın."), patch_polar_figure(), None
 
-        width = f"{df_valid['y_cm'].max() - df_valid['y_cm'].min():.1f} cm"
-        depth = f"{df_valid['x_cm'].max():.1f} cm"
+    scan_id = json.loads(scan_json).get('id', 'Bilinmiyor')
+    df, df_valid = parse_valid_points(points_json)
 
-        store_data = df_clustered.to_json(orient='split')
+    if df.empty:
+        return patch_3d_figure(f'Tarama #{scan_id} için Nokta Verisi Yok...'), patch_polar_figure(), None
+
+    title_3d = f'3D Tarama Görüntüsü - Tarama ID: {scan_id}'
+    if len(df_valid) <= 10:
+        return patch_3d_figure(title_3d), patch_polar_figure(), None
+
+    arrays = extract_point_arrays(df_valid)
+    last_point_id = int(arrays['id'].max())
+
+    state = render_state or {}
+    chunks = state.get('chunks', 0)
+    if state.get('scan_id') == scan_id and chunks < MAX_FIGURE_CHUNKS:
+        new_points = arrays['id'] > state['last_point_id']
+        if not new_points.any():
+            return no_update, no_update, state
+        delta = {key: values[new_points] for key, values in arrays.items()}
+        fig_3d = append_points_patch(build_3d_points_trace(delta, first=False))
+        fig_polar = append_points_patch(build_polar_points_trace(delta, first=False))
+        chunks += 1
+    else:
+        fig_3d = patch_3d_figure(title_3d, arrays)
+        fig_polar = patch_polar_figure(arrays)
+        chunks = 0
 
-    return fig_3d, fig_2d, fig_polar, analysis_report_component, store_data, area, perim, width, depth
+    return fig_3d, fig_polar, {'scan_id': scan_id, 'last_point_id': last_point_id, 'chunks': chunks}
+
+
+# 10b. 2D Harita ve Analizleri Güncelle (arka planda hesaplanır)
+@app.callback(
+    [Output('scan-map-graph-2d', 'figure'),
+     Output('environment-estimation-text', 'children'),
+     Output('clustered-data-store', 'data'),
+     Output('calculated-area', 'children'),
+     Output('perimeter-length', 'children'),
+     Output('max-width', 'children'),
+     Output('max-depth', 'children'),
+     Output('interval-component-analysis', 'disabled'),
+     Output('analysis-result-key', 'data')],
+    [Input('latest-scan-object-store', 'data'),
+     Input('latest-scan-points-store', 'data'),
+     Input('interval-component-analysis', 'n_intervals')],
+    State('analysis-result-key', 'data')
+)
+def update_map_and_analytics(scan_json, points_json, n_intervals, shown_key):
+    """2D haritayı ve analizleri güncelle - hesaplama sürerken callback beklemez"""
+    if not scan_json or not points_json:
+        return (
+            (waiting_figure(), html.Div("Analiz için veri bekleniyor."), None) + ("--",) * 4 + (True, None)
+        )
+
+    scan_id = json.loads(scan_json).get('id', 'Bilinmiyor')
+    key = hash((scan_json, points_json))
+    result, result_key, busy = poll_map_and_analytics(key, scan_id, points_json)
+
+    # İşçi meşgulken kısa aralıklarla sonucu yokla; bitince yoklamayı durdur
+    if result is None or result_key == shown_key:
+        return (no_update,) * 7 + (not busy, no_update)
+    return result + (not busy, result_key)
 
 
 # 11. Küme Bilgisi Modal
@@ -1141,13 +1809,13 @@ def update_all_graphs_and_analytics(scan_json, points_json):
     State("clustered-data-store", "data"),
     prevent_initial_call=True
 )
-def display_cluster_info(clickData, stored_data_json):
+def display_cluster_info(clickData, stored_data):
     """2D haritada bir noktaya tıklandığında küme bilgilerini göster"""
-    if not clickData or not stored_data_json:
+    if not clickData or not stored_data:
         return False, no_update, no_update
 
     try:
-        df_clus = pd.read_json(io.StringIO(stored_data_json), orient='split')
+        df_clus = decode_dataframe(stored_data)
         cl_label = clickData["points"][0].get('customdata')
 
         if cl_label is None or cl_label < -1:
@@ -1242,18 +1910,7 @@ def handle_3d_map_click(clickData):
         raise PreventUpdate
 
     # Otonom sürüş betiğinin çalışıp çalışmadığını kontrol et
-    is_autonomous_running = False
-    if os.path.exists(AUTONOMOUS_SCRIPT_PID_FILE):
-        try:
-            with open(AUTONOMOUS_SCRIPT_PID_FILE, 'r') as f:
-                pid_content = f.read().strip()
-                if pid_content:
-                    pid = int(pid_content)
-                    if is_process_running(pid):
-                        is_autonomous_running = True
-        except (IOError, ValueError, TypeError) as e:
-            logging.warning(f"Otonom PID dosyası okunamadı: {e}")
-            pass
+    is_autonomous_running = is_process_running(read_pid_file(AUTONOMOUS_SCRIPT_PID_FILE))
 
     if not is_autonomous_running:
         return (
@@ -3,16 +3,19 @@
 
 import json
 import time
+import random
 import logging
 import threading
 import warnings
-import cv2
-import queue
+import heapq
 import hashlib
-from typing import Optional, Tuple, Dict, List, Any, Callable
-from collections import deque
+import ctypes
+import ctypes.util
+from typing import Optional, Tuple, Dict, List, Any, Callable, NamedTuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future
+from queue import SimpleQueue
 import numpy as np
 
 # Config ve Utils dosyalarınızın import edildiğini varsayıyoruz.
@@ -23,14 +26,15 @@ try:
     )
     from .utils import (
         CircuitBreaker, FrameBuffer, FisheyeCorrector,
-        profile_performance, PerformanceMonitor
+        profile_performance, PerformanceMonitor, SharedFrameRing
     )
 except ImportError:
     logger = logging.getLogger(__name__)
     logging.warning("Config/Utils import edilemedi. Simülasyon modunda varsayılanlar kullanılacak.")
     # === ACİL DURUM CONFIG ===
     class CameraConfig:
-        DEFAULT_RESOLUTION = (1296, 972); FRAME_BUFFER_SIZE = 10; ENABLE_LENS_CORRECTION = True
+        DEFAULT_RESOLUTION = (1296, 972); FRAME_BUFFER_SIZE = 10; BUFFER_COUNT = 4; ENABLE_LENS_CORRECTION = True
+        PIXEL_FORMAT = "RGB888"; ENABLE_SHARED_FRAMES = False
         FOV_HORIZONTAL = 130; ENABLE_AUTO_EXPOSURE = True; ENABLE_AUTO_WHITE_BALANCE = True
         CAMERA_MODEL = "OV5647 130deg"; VIDEO_BITRATE = 10000000; VIDEO_FRAMERATE = 30
         MIN_FRAMERATE = 5; MAX_FRAMERATE = 60; DEFAULT_FRAMERATE = 30
@@ -65,8 +69,11 @@ except ImportError:
         H_MOTOR_IN1=17; H_MOTOR_IN2=18; H_MOTOR_IN3=27; H_MOTOR_IN4=22
         LIMIT_SWITCH_MIN=None; LIMIT_SWITCH_MAX=None; STEPS_PER_REV = 4076
         MIN_ANGLE = -90.0; MAX_ANGLE = 90.0; BACKLASH_COMPENSATION = 0.5
-        INVERT_DIRECTION = False; SETTLE_TIME = 0.05
+        INVERT_DIRECTION = False; SETTLE_TIME = 0.05; SETTLE_MIN_STEPS = 8; COALESCE_COMMANDS = True; USE_GPIO_GROUP_WRITE = True; GPIO_CHIP = 0
+        USE_NATIVE_STEP_LOOP = False
         STEP_SEQUENCE = [(1,0,0,1),(1,0,0,0),(1,1,0,0),(0,1,0,0),(0,1,1,0),(0,0,1,0),(0,0,1,1),(0,0,0,1)]
+        STEP_SEQUENCE_ARR = np.array(STEP_SEQUENCE, dtype=np.uint8)
+        STEP_MASKS = (STEP_SEQUENCE_ARR.astype(np.uint32) << np.arange(4, dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
         SPEED_PROFILES = {'slow': {'delay': 0.002, 'acceleration': 1.0}, 'normal': {'delay': 0.001, 'acceleration': 1.2}, 'fast': {'delay': 0.0006, 'acceleration': 1.4}}
     class SensorConfig:
         H_TRIG = 23; H_ECHO = 24; MAX_DISTANCE = 4.0; QUEUE_LEN = 5; THRESHOLD_DISTANCE = 0.01
@@ -88,17 +95,30 @@ except ImportError:
         @property
         def state(self): return "closed"
     class FrameBuffer:
-        def __init__(self, size): self.buffer = deque(maxlen=size); self.size=size
-        def add_frame(self, frame): self.buffer.append(frame)
-        def get_latest(self): return self.buffer[-1] if self.buffer else None
-        def clear(self): self.buffer.clear()
+        def __init__(self, size): self.size = size; self._frames = None; self._head = -1; self._count = 0
+        def __len__(self): return self._count
+        def add_frame(self, frame, **meta):
+            if self._frames is None or self._frames.shape[1:] != frame.shape or self._frames.dtype != frame.dtype:
+                self._frames = np.empty((self.size,) + frame.shape, dtype=frame.dtype); self._count = 0
+            self._head = (self._head + 1) % self.size
+            np.copyto(self._frames[self._head], frame)
+            self._count = min(self._count + 1, self.size)
+            return True
+        def get_latest(self): return self._frames[self._head].copy() if self._count else None
+        def get_latest_view(self): return self._frames[self._head] if self._count else None
+        def clear(self): self._head = -1; self._count = 0
     class FisheyeCorrector:
         def load_calibration(self): pass
+        def preload(self, resolution): pass
         def correct_distortion(self, frame, method='fast'): return frame
+        def correct_distortion_gray(self, frame):
+            import cv2
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     def profile_performance(func): return func
     class PerformanceMonitor:
         def record(self, metric, value): pass
         def get_stats(self, metric): return {}
+    SharedFrameRing = None
 
 
 # Logger
@@ -106,7 +126,7 @@ logger = logging.getLogger(__name__)
 
 # Donanım kütüphaneleri
 try:
-    from picamera2 import Picamera2
+    from picamera2 import Picamera2, MappedArray
     from picamera2.encoders import H264Encoder
     CAMERA_AVAILABLE = True
 except ImportError:
@@ -114,17 +134,31 @@ except ImportError:
     logger.warning("picamera2 kütüphanesi bulunamadı. OV5647 simülasyon modunda.")
     class Picamera2:
         def __init__(self): logger.warning("Picamera2 simüle ediliyor.")
-        def create_video_configuration(self, main, controls): return {}
+        def create_video_configuration(self, main, controls, lores=None, buffer_count=4): return {}
         def configure(self, config): pass
         def set_controls(self, controls): pass
         def start(self): pass
-        def capture_array(self): return None
+        def capture_array(self, name="main"): return None
+        def capture_request(self): return None
         def start_recording(self, encoder, filepath, metadata): pass
         def stop_recording(self): pass
         def stop(self): pass
         def close(self): pass
     class H264Encoder:
         def __init__(self, bitrate): pass
+    MappedArray = None
+
+# Motor pinlerini tek çağrıda yazmak için lgpio grup erişimi (opsiyonel; yoksa gpiozero cihazları kullanılır)
+try:
+    import lgpio
+except ImportError:
+    lgpio = None
+
+# Sensör döngüsündeki skaler hesaplar için JIT derleyici (opsiyonel)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 try:
     from gpiozero import OutputDevice, DistanceSensor, Button
@@ -134,12 +168,21 @@ except ImportError:
     GPIO_AVAILABLE = False
     logger.warning("GPIO kütüphaneleri bulunamadı. Motor/Sensör simülasyon modunda.")
     class DistanceSensor:
+        BATCH_SIZE = 1024
         def __init__(self, echo, trigger, max_distance, queue_len, threshold_distance):
             logger.warning("DistanceSensor simüle ediliyor.")
             self._distance = 0.5
+            # Simüle ölçümler kilitsiz Generator ile toplu üretilir
+            self._rng = np.random.default_rng()
+            self._batch = self._rng.uniform(0.1, 3.0, size=self.BATCH_SIZE)
+            self._batch_idx = 0
         @property
         def distance(self):
-            self._distance = np.random.uniform(0.1, 3.0)
+            if self._batch_idx >= self.BATCH_SIZE:
+                self._batch = self._rng.uniform(0.1, 3.0, size=self.BATCH_SIZE)
+                self._batch_idx = 0
+            self._distance = float(self._batch[self._batch_idx])
+            self._batch_idx += 1
             return self._distance
         def close(self): pass
     class Button:
@@ -157,68 +200,415 @@ except ImportError:
         def value(self, val): self._value = 1 if val else 0
 
 
+class CaptureSettings(NamedTuple):
+    """Doğrulanmış kamera ayarları (değişmez; == ile karşılaştırılır, cache anahtarı olarak kullanılır)"""
+    resolution: Tuple[int, int]
+    framerate: float
+    ae_enable: bool
+    awb_enable: bool
+    exposure_time: int
+    analogue_gain: float
+    brightness: float
+    contrast: float
+    saturation: float
+    sharpness: float
+    awb_mode: str
+    colour_effect: str
+    flicker_mode: str
+    exposure_mode: str
+    metering_mode: str
+
+
+class MotorContext:
+    """Motorun değişken durumu (__slots__: adım döngüsünde sözlük araması yerine sabit ofsetli öznitelik erişimi)"""
+    __slots__ = ('current_step', 'sequence_index', 'total_steps', 'is_moving', 'last_direction',
+                 'target_angle', 'cancel_movement', 'speed_profile', 'backlash_compensation')
+
+    def __init__(self):
+        # Konum tamsayı adım olarak tutulur (binlerce harekette kayan nokta kayması birikmez)
+        self.current_step = 0
+        self.sequence_index = 0
+        self.total_steps = 0
+        self.is_moving = False
+        self.last_direction = None
+        self.target_angle = 0.0
+        self.cancel_movement = False
+        self.speed_profile = 'normal'
+        self.backlash_compensation = MotorConfig.BACKLASH_COMPENSATION
+
+    @property
+    def current_angle(self) -> float:
+        """Adım konumundan türetilen açı (derece)"""
+        return self.current_step * 360.0 / MotorConfig.STEPS_PER_REV
+
+    @current_angle.setter
+    def current_angle(self, angle: float):
+        self.current_step = round(angle * MotorConfig.STEPS_PER_REV / 360.0)
+
+
+class MotorSnapshot(NamedTuple):
+    """Motor durumunun tutarlı anlık görüntüsü (tek atamayla yayınlanır; okuyucular kilit almaz)"""
+    angle: float
+    is_moving: bool
+    target: float
+
+
+# Simülasyon karesindeki FOV işaretleri: açı ve ±65°'ye göre normalize tan değerleri (çözünürlükten bağımsız)
+_FOV_MARKER_ANGLES = (-65, -45, -30, -15, 0, 15, 30, 45, 65)
+_FOV_MARKER_TAN = np.tan(np.radians(_FOV_MARKER_ANGLES)) / np.tan(np.radians(65))
+
+
+@lru_cache(maxsize=64)
+def _controls_from_key(settings: CaptureSettings) -> Dict[str, Any]:
+    """Ayarlardan libcamera kontrol sözlüğü (paylaşılan nesne; değiştirilmemeli)"""
+    return CameraConfig.get_camera_settings(**settings._asdict())
+
+
 # ============================================================================
 # MOTOR KOMUT QUEUE SİSTEMİ
 # ============================================================================
 
+class MotorCommand:
+    """Motor komut kaydı (__slots__ ile sözlükten küçük, havuzda yeniden kullanılır)"""
+    __slots__ = ('angle', 'callback', 'timestamp', 'waited')
+
+    def __init__(self):
+        self.angle = 0.0
+        self.callback = None
+        self.timestamp = 0
+        # move_to_angle(wait=True) bu komutun işlenmesini bekliyor: birleştirmede atılmaz
+        self.waited = False
+
+
 class MotorCommandQueue:
-    """Öncelikli motor komut kuyruğu"""
+    """Öncelikli motor komut kuyruğu (tek kilitle korunan heapq)"""
+    POOL_SIZE = 64
+
     def __init__(self):
-        self.queue = queue.PriorityQueue()
+        self._heap: List[Tuple[int, int, MotorCommand]] = []
+        # İşlenip geri verilen komut kayıtları; yeni komutlar önce buradan alınır
+        self._pool: List[MotorCommand] = [MotorCommand() for _ in range(self.POOL_SIZE)]
+        self._seq = 0  # Aynı öncelikteki komutlar eklenme sırasıyla çıkar
         self.processing = False
         self.lock = threading.Lock()
+        # Kuyrukta komut varken set edilir; motor thread'i yoklamak yerine bunu bekler
+        self._ready = threading.Event()
 
-    def add_command(self, angle: float, priority: int = 5, callback: Callable = None):
-        command = {'angle': angle, 'callback': callback, 'timestamp': time.time()}
-        self.queue.put((priority, time.time(), command))
+    def add_command(self, angle: float, priority: int = 5, callback: Callable = None, waited: bool = False):
+        # Zaman damgası yalnızca süre ölçümü için (tamsayı ns): monotonic saat ayarlarından etkilenmez
+        timestamp = time.monotonic_ns()
+        with self.lock:
+            command = self._pool.pop() if self._pool else MotorCommand()
+            command.angle = angle
+            command.callback = callback
+            command.waited = waited
+            command.timestamp = timestamp
+            self._seq += 1
+            heapq.heappush(self._heap, (priority, self._seq, command))
+            self._ready.set()
+
+    def get_next(self, timeout: Optional[float] = None) -> Optional[MotorCommand]:
+        """
+        Sıradaki komutu al; timeout verilirse kuyruk boşken en fazla o kadar komut bekle.
+        İşi biten komut release() ile havuza geri verilmelidir.
+        """
+        # Boş kuyrukta kilit hiç alınmaz
+        if not self._heap:
+            if not timeout or not self._ready.wait(timeout):
+                return None
+        with self.lock:
+            if not self._heap:
+                return None
+            command = heapq.heappop(self._heap)[2]
+            if not self._heap:
+                self._ready.clear()
+            return command
+
+    def peek_angle(self) -> Optional[float]:
+        """Sıradaki komutun hedef açısı (komut alınmaz); kuyruk boşsa None"""
+        if not self._heap:
+            return None
+        with self.lock:
+            return self._heap[0][2].angle if self._heap else None
 
-    def get_next(self) -> Optional[Dict]:
-        try:
-            if not self.queue.empty():
-                _, _, command = self.queue.get_nowait()
-                return command
-        except queue.Empty:
-            pass
-        return None
+    def release(self, command: MotorCommand):
+        """İşlenen komut kaydını havuza geri ver"""
+        command.callback = None
+        command.waited = False
+        with self.lock:
+            if len(self._pool) < self.POOL_SIZE:
+                self._pool.append(command)
 
     def clear(self):
+        # Kilit altında yalnızca liste değiştirilir; atılan komutlar kilit dışında temizlenip havuza toplu döner
         with self.lock:
-            while not self.queue.empty():
-                try:
-                    self.queue.get_nowait()
-                except queue.Empty:
-                    break
+            old, self._heap = self._heap, []
+            self._ready.clear()
+        if not old:
+            return
+        commands = [entry[2] for entry in old]
+        for command in commands:
+            command.callback = None
+            command.waited = False
+        with self.lock:
+            self._pool.extend(commands[:self.POOL_SIZE - len(self._pool)])
+
+    def coalesce(self) -> int:
+        """
+        Sırada birden fazla komut varsa yalnızca en son çalışacak hedefi (ve callback'li ya da beklenen komutları) tut:
+        açılar mutlak olduğundan motorun ara hedeflere uğraması gerekmez. Atılan komut sayısını döndürür.
+        """
+        with self.lock:
+            if len(self._heap) < 2:
+                return 0
+            final = max(self._heap)  # (öncelik, sıra) benzersiz: en son işlenecek komut
+            kept = []
+            for entry in self._heap:
+                command = entry[2]
+                if entry is final or command.callback is not None or command.waited:
+                    kept.append(entry)
+                elif len(self._pool) < self.POOL_SIZE:
+                    self._pool.append(command)
+            dropped = len(self._heap) - len(kept)
+            if dropped:
+                self._heap[:] = kept
+                heapq.heapify(self._heap)
+            return dropped
 
     def size(self) -> int:
-        return self.queue.qsize()
+        """Kuyruktaki komut sayısı - kilitsiz okunur (durum göstergeleri için, anlık değer yaklaşıktır)"""
+        return len(self._heap)
+
+
+class MotorPinGroup:
+    """Dört motor pinini tek lgpio grubu olarak sür: her adım tek group_write (tek ioctl), 4 ayrı yazma değil"""
+
+    def __init__(self, chip: int, pins: Tuple[int, ...]):
+        self.handle = lgpio.gpiochip_open(chip)
+        try:
+            lgpio.group_claim_output(self.handle, list(pins), [0] * len(pins))
+        except Exception:
+            lgpio.gpiochip_close(self.handle)
+            raise
+        self.leader = pins[0]
+        self.all_bits = (1 << len(pins)) - 1
+
+    def write(self, bits: int):
+        """Bit i = grubun i. pini (IN1 = bit 0)"""
+        lgpio.group_write(self.handle, self.leader, bits, self.all_bits)
+
+    def off(self):
+        self.write(0)
+
+    def close(self):
+        try:
+            self.off()
+            lgpio.group_free(self.handle, self.leader)
+        finally:
+            lgpio.gpiochip_close(self.handle)
+
+
+def _build_native_step_loop(group_write):
+    """lgGroupWrite + clock_nanosleep(TIMER_ABSTIME) ile adım döngüsünü GIL'siz derle"""
+    libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    clock_gettime = libc.clock_gettime
+    clock_gettime.argtypes = (ctypes.c_int, ctypes.c_void_p)
+    clock_gettime.restype = ctypes.c_int
+    clock_nanosleep = libc.clock_nanosleep
+    clock_nanosleep.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+    clock_nanosleep.restype = ctypes.c_int
+
+    @njit(nogil=True)
+    def step_loop(handle, leader, all_bits, masks, indices, delays_ns, cancel, limits, limit_slot, ts):
+        # ts: timespec olarak kullanılan (saniye, nanosaniye) int64 çifti; C'ye adres (void *) olarak geçer
+        ts_ptr = ts.ctypes.data
+        clock_gettime(1, ts_ptr)  # CLOCK_MONOTONIC
+        deadline = ts[0] * 1000000000 + ts[1]
+        for i in range(indices.shape[0]):
+            if cancel[0] or limits[limit_slot]:
+                return i
+            group_write(handle, leader, masks[indices[i]], all_bits)
+            deadline += delays_ns[i]
+            ts[0] = deadline // 1000000000
+            ts[1] = deadline % 1000000000
+            # TIMER_ABSTIME: kalan süre yazılmaz, remain argümanına da aynı tampon verilir
+            clock_nanosleep(1, 1, ts_ptr, ts_ptr)
+        return indices.shape[0]
+
+    return step_loop
+
+
+# İlk NativeMotorPinGroup oluşturulurken derlenir
+_native_step_loop = None
+
+
+class NativeMotorPinGroup(MotorPinGroup):
+    """
+    liblgpio'ya ctypes ile bağlanan pin grubu: hareketin tüm adımları numba ile derlenmiş döngüde,
+    GIL bırakılarak ve mutlak zamanlı bekleme ile atılır (MotorConfig.USE_NATIVE_STEP_LOOP).
+    """
+    def __init__(self, chip: int, pins: Tuple[int, ...]):
+        lib = ctypes.CDLL(ctypes.util.find_library('lgpio') or 'liblgpio.so.1')
+        lib.lgGroupClaimOutput.argtypes = (
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+        )
+        lib.lgGroupWrite.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_uint64, ctypes.c_uint64)
+        lib.lgGroupWrite.restype = ctypes.c_int
+        self._lib = lib
+        self._timespec = np.zeros(2, dtype=np.int64)
+
+        global _native_step_loop
+        if _native_step_loop is None:
+            step_loop = _build_native_step_loop(lib.lgGroupWrite)
+            # Boş hareketle şimdi derlenir: tip hatası ilk harekette değil burada çıkar (pinler henüz alınmadan)
+            step_loop(0, 0, 0, MotorConfig.STEP_MASKS, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                      np.zeros(1, dtype=np.uint8), np.zeros(2, dtype=np.uint8), 0, self._timespec)
+            _native_step_loop = step_loop
+
+        handle = lib.lgGpiochipOpen(chip)
+        if handle < 0:
+            raise OSError(f"lgGpiochipOpen({chip}) hatası: {handle}")
+        gpios = (ctypes.c_int * len(pins))(*pins)
+        levels = (ctypes.c_int * len(pins))()
+        status = lib.lgGroupClaimOutput(handle, 0, len(pins), gpios, levels)
+        if status < 0:
+            lib.lgGpiochipClose(handle)
+            raise OSError(f"lgGroupClaimOutput hatası: {status}")
+
+        self.handle = handle
+        self.leader = pins[0]
+        self.all_bits = (1 << len(pins)) - 1
+        # Python tarafından set edilir, derlenmiş döngü her adımda okur
+        self.cancel_flag = np.zeros(1, dtype=np.uint8)
+
+    def write(self, bits: int):
+        self._lib.lgGroupWrite(self.handle, self.leader, bits, self.all_bits)
+
+    def close(self):
+        try:
+            self.off()
+            self._lib.lgGroupFree(self.handle, self.leader)
+        finally:
+            self._lib.lgGpiochipClose(self.handle)
+
+    def run(self, masks: np.ndarray, indices: np.ndarray, delays: np.ndarray,
+            limits: np.ndarray, limit_slot: int) -> int:
+        """Adımları at (delays saniye); cancel_flag veya limits[limit_slot] set edilirse erken döner. Atılan adım sayısı"""
+        delays_ns = (delays * 1e9).astype(np.int64)
+        return _native_step_loop(self.handle, self.leader, self.all_bits, masks, indices,
+                                 delays_ns, self.cancel_flag, limits, limit_slot, self._timespec)
+
+
+def _build_step_transitions(sequence: np.ndarray) -> Tuple[Tuple[Tuple, ...], Tuple[Tuple, ...]]:
+    """
+    Bobin dizisindeki ardışık desenler arası geçişlerde değişen (bobin, değer) çiftleri:
+    [0][i] i → i+1, [1][i] i → i-1 geçişi (yarım adım dizisinde her geçişte tek bobin)
+    """
+    n = len(sequence)
+    patterns = sequence.astype(bool).tolist()
+
+    def changes(a, b):
+        return tuple((coil, value) for coil, (old, value) in enumerate(zip(patterns[a], patterns[b])) if old != value)
+
+    return (tuple(changes(i, (i + 1) % n) for i in range(n)),
+            tuple(changes(i, (i - 1) % n) for i in range(n)))
+
+
+# gpiozero adım yolu için import sırasında bir kez hesaplanır
+_STEP_TRANSITIONS = _build_step_transitions(MotorConfig.STEP_SEQUENCE_ARR)
+
+# Adım zamanlaması: kalan süre eşikten uzunsa marj kadar erken uyanacak şekilde uyunur, kalanı perf_counter ile beklenir
+_STEP_SLEEP_THRESHOLD = 300e-6
+_STEP_SPIN_MARGIN = 200e-6
+# Python adım döngüsünde motor anlık görüntüsü her adımda değil bu kadar adımda bir (ve hareket sonunda) yayınlanır
+_SNAPSHOT_PUBLISH_STEPS = 32
+
+
+@lru_cache(maxsize=32)
+def _step_ramps(base_delay: float, acceleration: float, ramp_steps: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hızlanma ve yavaşlama rampaları (salt okunur; hız profili başına bir kez hesaplanır)"""
+    progress = np.arange(ramp_steps) / ramp_steps
+    accel = np.maximum(base_delay * (3 - 2 * progress * acceleration), 0.0001)
+    progress = np.arange(ramp_steps, 0, -1) / ramp_steps
+    decel = np.maximum(base_delay * (3 - 2 * progress * acceleration), 0.0001)
+    accel.setflags(write=False)
+    decel.setflags(write=False)
+    return accel, decel
+
+
+def _step_delay_schedule(num_steps: int, base_delay: float, acceleration: float) -> np.ndarray:
+    """Hareketin tüm adım beklemeleri: hızlanma rampası, sabit orta bölüm, ters yavaşlama rampası (saniye)"""
+    ramp_steps = min(100, num_steps // 4)
+    delays = np.full(num_steps, max(base_delay, 0.0001), dtype=np.float64)
+    if ramp_steps:
+        accel, decel = _step_ramps(base_delay, acceleration, ramp_steps)
+        delays[:ramp_steps] = accel
+        delays[num_steps - ramp_steps:] = decel
+    return delays
 
 
 # ============================================================================
 # ADAPTIVE SENSOR READER
 # ============================================================================
 
+def _adapt_read_interval(variation, stable_count, interval, min_interval, max_interval, threshold):
+    """Okuma değişimine göre yeni (aralık, kararlılık sayacı) çiftini hesapla"""
+    if variation < threshold:
+        stable_count += 1
+        if stable_count > 10:
+            interval = min(max_interval, interval * 1.1)
+    else:
+        stable_count = 0
+        interval = min_interval
+    return interval, stable_count
+
+
+if njit is not None:
+    # Açık imza ile import sırasında derlenir (cache=True ile diskten yüklenir); ilk derleme sensör thread'inin
+    # ilk okumasına denk gelip kontrol döngüsünü bekletmesin
+    _adapt_read_interval = njit(
+        'Tuple((float64, int64))(float64, int64, float64, float64, float64, float64)', cache=True, fastmath=True
+    )(_adapt_read_interval)
+
+
 class AdaptiveSensorReader:
-    """Adaptif hızda sensör okuyucu"""
+    """Adaptif hızda sensör okuyucu - kararlılık son okumaların standart sapmasına göre belirlenir"""
+    WINDOW_SIZE = 16
+    MIN_WINDOW_SAMPLES = 4
+
     def __init__(self, sensor):
         self.sensor = sensor
         self.stable_count = 0
         self.last_reading = None
-        self.read_interval = SensorConfig.MIN_READ_INTERVAL
+        # Sınırlar her okumada SensorConfig'ten aranmasın diye bir kez alınır
+        self._min_interval = float(SensorConfig.MIN_READ_INTERVAL)
+        self._max_interval = float(SensorConfig.MAX_READ_INTERVAL)
+        self.read_interval = self._min_interval
         self.variance_threshold = 2.0
+        # Son okumalar için sabit boyutlu halka tampon
+        self._ring = np.zeros(self.WINDOW_SIZE, dtype=np.float32)
+        self._ring_idx = 0
+        self._ring_filled = 0
 
     def get_adaptive_interval(self, new_reading: float) -> float:
+        self._ring[self._ring_idx] = new_reading
+        self._ring_idx = (self._ring_idx + 1) % self.WINDOW_SIZE
+        self._ring_filled = min(self._ring_filled + 1, self.WINDOW_SIZE)
+
         if self.last_reading is None:
             self.last_reading = new_reading
             return self.read_interval
 
-        change = abs(new_reading - self.last_reading)
-        if change < self.variance_threshold:
-            self.stable_count += 1
-            if self.stable_count > 10:
-                self.read_interval = min(SensorConfig.MAX_READ_INTERVAL, self.read_interval * 1.1)
+        # Pencere dolana kadar tek örnek farkı, sonra pencerenin standart sapması kullanılır
+        if self._ring_filled >= self.MIN_WINDOW_SAMPLES:
+            variation = float(self._ring[:self._ring_filled].std())
         else:
-            self.stable_count = 0
-            self.read_interval = SensorConfig.MIN_READ_INTERVAL
+            variation = abs(new_reading - self.last_reading)
+
+        self.read_interval, self.stable_count = _adapt_read_interval(
+            variation, self.stable_count, self.read_interval,
+            self._min_interval, self._max_interval, self.variance_threshold
+        )
 
         self.last_reading = new_reading
         return self.read_interval
@@ -237,12 +627,18 @@ class HardwareManager:
     # Versiyon bilgisi
     VERSION = "3.17-ULTIMATE-DEFENSIVE" # GÜNCELLENDİ
 
-    def __init__(self):
+    def __init__(self, grayscale_only: bool = False):
         # Donanım objeleri
         self.camera: Optional[Picamera2] = None
+        # True ise kameraya YUV420 'lores' akışı eklenir; capture_luma_frame() RGB kopyası yapmadan Y düzlemini okur
+        self.grayscale_only = grayscale_only
         self.motor_devices: Optional[Tuple] = None
+        # lgpio varsa motor pinleri grup olarak sürülür (motor_devices yerine)
+        self._motor_pins: Optional[MotorPinGroup] = None
         self.sensor: Optional[DistanceSensor] = None
         self.limit_switches: Dict[str, Optional[Button]] = {'min': None, 'max': None}
+        # Limit switch durumları [min, max]: kenar callback'leriyle güncellenir, adım döngüsü pini okumaz
+        self._limit_hit = np.zeros(2, dtype=np.uint8)
 
         # OV5647 lens düzeltici
         self.fisheye_corrector = FisheyeCorrector()
@@ -252,11 +648,8 @@ class HardwareManager:
         self.frame_buffer = FrameBuffer(size=CameraConfig.FRAME_BUFFER_SIZE)
 
         # Motor yönetimi
-        self.motor_ctx = {
-            'current_angle': 0.0, 'sequence_index': 0, 'total_steps': 0,
-            'is_moving': False, 'last_direction': None, 'target_angle': 0.0,
-            'cancel_movement': False, 'speed_profile': 'normal'
-        }
+        self.motor_ctx = MotorContext()
+        self._motor_snapshot = MotorSnapshot(0.0, False, 0.0)
         self.motor_command_queue = MotorCommandQueue()
 
         # Video kaydı
@@ -277,30 +670,52 @@ class HardwareManager:
             max_workers=AppConfig.MAX_THREAD_POOL_SIZE
         ) if AppConfig.USE_THREAD_POOL else None
 
+        # Cihaz başına tek thread'li iş kuyrukları (ilk submit'te başlar): yavaş bir iş diğer cihazın işini bekletmez;
+        # havuz yalnızca başlatma/temizlik gibi seyrek toplu işler için kalır
+        self._work_queues: Dict[str, SimpleQueue] = {}
+        self._workers: Dict[str, threading.Thread] = {}
+        self._workers_lock = threading.Lock()
+        # cleanup_all() ile kapanır, initialize_all() ile yeniden açılır; kapalıyken submit() iş kabul etmez
+        self._workers_running = True
+
         # Başlatma durumu
         self._initialized = {'camera': False, 'motor': False, 'sensor': False}
 
         # === YENİ (v3.16) Mevcut Kamera Ayarları Cache ===
-        self._camera_settings_cache = {
-            'resolution': CameraConfig.DEFAULT_RESOLUTION,
-            'framerate': CameraConfig.DEFAULT_FRAMERATE,
-            'ae_enable': CameraConfig.ENABLE_AUTO_EXPOSURE,
-            'awb_enable': CameraConfig.ENABLE_AUTO_WHITE_BALANCE,
-            'exposure_time': CameraConfig.DEFAULT_EXPOSURE_TIME,
-            'analogue_gain': CameraConfig.DEFAULT_ANALOGUE_GAIN,
-            'brightness': CameraConfig.DEFAULT_BRIGHTNESS,
-            'contrast': CameraConfig.DEFAULT_CONTRAST,
-            'saturation': CameraConfig.DEFAULT_SATURATION,
-            'sharpness': CameraConfig.DEFAULT_SHARPNESS,
-            'awb_mode': CameraConfig.DEFAULT_AWB_MODE,
-            'colour_effect': CameraConfig.DEFAULT_COLOUR_EFFECT,
-            'flicker_mode': CameraConfig.DEFAULT_FLICKER_MODE,
-            'exposure_mode': CameraConfig.DEFAULT_EXPOSURE_MODE,
-            'metering_mode': CameraConfig.DEFAULT_METERING_MODE,
-        }
-        self._settings_hash = None
+        self._current_settings = CaptureSettings(
+            resolution=tuple(CameraConfig.DEFAULT_RESOLUTION),
+            framerate=CameraConfig.DEFAULT_FRAMERATE,
+            ae_enable=CameraConfig.ENABLE_AUTO_EXPOSURE,
+            awb_enable=CameraConfig.ENABLE_AUTO_WHITE_BALANCE,
+            exposure_time=CameraConfig.DEFAULT_EXPOSURE_TIME,
+            analogue_gain=CameraConfig.DEFAULT_ANALOGUE_GAIN,
+            brightness=CameraConfig.DEFAULT_BRIGHTNESS,
+            contrast=CameraConfig.DEFAULT_CONTRAST,
+            saturation=CameraConfig.DEFAULT_SATURATION,
+            sharpness=CameraConfig.DEFAULT_SHARPNESS,
+            awb_mode=CameraConfig.DEFAULT_AWB_MODE,
+            colour_effect=CameraConfig.DEFAULT_COLOUR_EFFECT,
+            flicker_mode=CameraConfig.DEFAULT_FLICKER_MODE,
+            exposure_mode=CameraConfig.DEFAULT_EXPOSURE_MODE,
+            metering_mode=CameraConfig.DEFAULT_METERING_MODE,
+        )
+        # Kameraya son uygulanan ayarlar (her karede JSON+hash yerine == karşılaştırması)
+        self._settings_key: Optional[CaptureSettings] = None
+        # Kameraya son gönderilen libcamera kontrolleri (hafif güncellemede yalnızca fark gönderilir)
+        self._camera_controls: Optional[Dict[str, Any]] = None
         # === SON ===
 
+        # Diğer süreçlere /dev/shm üzerinden kare yayını (CameraConfig.ENABLE_SHARED_FRAMES)
+        self._shared_frames = None
+
+        # Simülasyon karesinin sabit arka planı (çözünürlük başına bir kez çizilir)
+        self._testframe_bg_cache: Dict[Tuple[int, int], np.ndarray] = {}
+        # Ayar yazıları çizilmiş son kare: ((genişlik, yükseklik, yazılar), kare); ayarlar değişince yeniden çizilir
+        self._testframe_static: Optional[Tuple[tuple, np.ndarray]] = None
+        # Simülasyon karesindeki saat yazısı ~10 Hz'de bir yenilenir (her karede datetime üretilmez)
+        self._last_ts_str = ""
+        self._last_ts_ns = 0
+
         # Circuit breakers
         self.circuit_breakers = {
             'camera': CircuitBreaker(
@@ -324,10 +739,20 @@ class HardwareManager:
         self.sensor_running = False
         self.current_distance = None
         self.adaptive_sensor = None
+        # Tek ölçümün ham okumaları için önceden ayrılmış tampon
+        self._read_buf = np.empty(SensorConfig.READ_ATTEMPTS, dtype=np.float64)
+        # Sıcaklık düzeltmesi (ses hızı / 343) her okumada değil, 5 sn'de bir hesaplanır
+        self._sound_correction = 1.0
+        self._correction_expires_at = 0.0
+        # Geçerli mesafe aralığı ham ölçü (m * 100) cinsinden: [düzeltilmiş alt, üst, düzeltmesiz alt, üst]
+        self._raw_valid_range = (0.0, 0.0, 0.0, 0.0)
 
         # Motor thread
         self.motor_thread: Optional[threading.Thread] = None
         self.motor_queue_running = False
+        # Kuyruk boşalıp son hareket bittiğinde set edilir (move_to_angle(wait=True) yoklama yapmadan bekler)
+        self._motor_idle = threading.Event()
+        self._motor_idle.set()
 
         logger.info("=" * 60)
         logger.info(f"HARDWARE MANAGER BAŞLATILDI ({self.VERSION})")
@@ -339,10 +764,31 @@ class HardwareManager:
     # KAMERA YÖNETİMİ (TAM KONTROL)
     # ========================================================================
 
+    @property
+    def _camera_settings_cache(self) -> Dict[str, Any]:
+        """Mevcut kamera ayarları sözlük olarak (durum raporu/metadata için)"""
+        return self._current_settings._asdict()
+
     def _calculate_settings_hash(self, **settings) -> str:
-        """Ayarlar hash'i hesapla (değişiklik tespiti için)"""
+        """Ayarlar hash'i hesapla (yalnızca durum raporu için)"""
         settings_str = json.dumps(settings, sort_keys=True)
-        return hashlib.md5(settings_str.encode()).hexdigest()
+        return hashlib.blake2b(settings_str.encode(), digest_size=16).hexdigest()
+
+    def _create_video_configuration(self, resolution: Tuple[int, int], camera_controls: Dict[str, Any]):
+        """
+        Ana akış (CameraConfig.PIXEL_FORMAT) ve gerekirse aynı boyutta YUV420 lores akışı için yapılandırma oluştur.
+        Ana akış zaten YUV420 ise lores eklenmez; Y düzlemi ana akıştan okunur.
+        En az 4 DMA tamponu: Python tarafı bir karede gecikince sensör bekleyen boş tampona yazmaya devam eder
+        (bedeli: buffer_count x kare boyutu kadar CMA belleği).
+        """
+        streams = {'main': {"size": resolution, "format": CameraConfig.PIXEL_FORMAT}}
+        if self.grayscale_only and CameraConfig.PIXEL_FORMAT != "YUV420":
+            streams['lores'] = {"size": resolution, "format": "YUV420"}
+        return self.camera.create_video_configuration(
+            controls=camera_controls,
+            buffer_count=max(4, CameraConfig.BUFFER_COUNT),
+            **streams
+        )
 
     @profile_performance
     def initialize_camera(self, retry: bool = True) -> bool:
@@ -360,27 +806,25 @@ class HardwareManager:
             self.camera = Picamera2()
 
             # Başlangıç ayarlarını cache'den al
-            initial_settings = self._camera_settings_cache.copy()
+            initial_settings = self._current_settings
 
             # libcamera kontrolleri oluştur
             try:
-                camera_controls = CameraConfig.get_camera_settings(**initial_settings)
+                camera_controls = dict(_controls_from_key(initial_settings))
             except TypeError as e:
                 logger.error(f"Config hatası: {e}. Varsayılan ayarlar kullanılıyor.")
                 camera_controls = CameraConfig.get_camera_settings()
 
-            config = self.camera.create_video_configuration(
-                main={
-                    "size": initial_settings['resolution'],
-                    "format": "RGB888"
-                },
-                controls=camera_controls
-            )
+            config = self._create_video_configuration(initial_settings.resolution, camera_controls)
             self.camera.configure(config)
             self.camera.start()
+            self._camera_controls = camera_controls
+
+            self._settings_key = initial_settings
 
-            # Hash hesapla
-            self._settings_hash = self._calculate_settings_hash(**initial_settings)
+            # Remap tabloları kamera otururken hesaplanır; ilk düzeltilmiş kare beklemez
+            if CameraConfig.ENABLE_LENS_CORRECTION:
+                self.fisheye_corrector.preload(initial_settings.resolution)
 
             time.sleep(2)
 
@@ -393,9 +837,9 @@ class HardwareManager:
             self._initialized['camera'] = True
 
             logger.info("✓ OV5647 130° kamera başarıyla başlatıldı")
-            logger.info(f"  Çözünürlük: {initial_settings['resolution']}")
-            logger.info(f"  FPS: {initial_settings['framerate']}")
-            logger.info(f"  AE/AWB: {initial_settings['ae_enable']}/{initial_settings['awb_enable']}")
+            logger.info(f"  Çözünürlük: {initial_settings.resolution}")
+            logger.info(f"  FPS: {initial_settings.framerate}")
+            logger.info(f"  AE/AWB: {initial_settings.ae_enable}/{initial_settings.awb_enable}")
             logger.info(f"  FOV: {CameraConfig.FOV_HORIZONTAL}° yatay")
 
             return True
@@ -454,42 +898,33 @@ class HardwareManager:
             numpy.ndarray or None
         """
 
-        # Varsayılan değerler (cache'den)
-        cache = self._camera_settings_cache
-
-        new_settings = {
-            'resolution': resolution or cache['resolution'],
-            'framerate': framerate or cache['framerate'],
-            'ae_enable': ae_enable if ae_enable is not None else cache['ae_enable'],
-            'awb_enable': awb_enable if awb_enable is not None else cache['awb_enable'],
-            'exposure_time': exposure_time or cache['exposure_time'],
-            'analogue_gain': analogue_gain or cache['analogue_gain'],
-            'brightness': brightness if brightness is not None else cache['brightness'],
-            'contrast': contrast if contrast is not None else cache['contrast'],
-            'saturation': saturation if saturation is not None else cache['saturation'],
-            'sharpness': sharpness if sharpness is not None else cache['sharpness'],
-            'awb_mode': awb_mode or cache['awb_mode'],
-            'colour_effect': colour_effect or cache['colour_effect'],
-            'flicker_mode': flicker_mode or cache['flicker_mode'],
-            'exposure_mode': exposure_mode or cache['exposure_mode'],
-            'metering_mode': metering_mode or cache['metering_mode'],
-        }
-
-        # Validasyonlar
-        new_settings['framerate'] = CameraConfig.validate_framerate(
-            new_settings['framerate'],
-            new_settings['resolution']
+        # Varsayılan değerler (mevcut ayarlardan) + validasyonlar
+        cur = self._current_settings
+        res = tuple(resolution) if resolution else cur.resolution
+
+        new_settings = CaptureSettings(
+            resolution=res,
+            framerate=CameraConfig.validate_framerate(framerate or cur.framerate, res),
+            ae_enable=ae_enable if ae_enable is not None else cur.ae_enable,
+            awb_enable=awb_enable if awb_enable is not None else cur.awb_enable,
+            exposure_time=CameraConfig.validate_exposure_time(exposure_time or cur.exposure_time),
+            analogue_gain=CameraConfig.validate_gain(analogue_gain or cur.analogue_gain),
+            brightness=CameraConfig.validate_brightness(brightness if brightness is not None else cur.brightness),
+            contrast=CameraConfig.validate_contrast(contrast if contrast is not None else cur.contrast),
+            saturation=CameraConfig.validate_saturation(saturation if saturation is not None else cur.saturation),
+            sharpness=CameraConfig.validate_sharpness(sharpness if sharpness is not None else cur.sharpness),
+            awb_mode=awb_mode or cur.awb_mode,
+            colour_effect=colour_effect or cur.colour_effect,
+            flicker_mode=flicker_mode or cur.flicker_mode,
+            exposure_mode=exposure_mode or cur.exposure_mode,
+            metering_mode=metering_mode or cur.metering_mode,
         )
-        new_settings['exposure_time'] = CameraConfig.validate_exposure_time(new_settings['exposure_time'])
-        new_settings['analogue_gain'] = CameraConfig.validate_gain(new_settings['analogue_gain'])
-        new_settings['brightness'] = CameraConfig.validate_brightness(new_settings['brightness'])
-        new_settings['contrast'] = CameraConfig.validate_contrast(new_settings['contrast'])
-        new_settings['saturation'] = CameraConfig.validate_saturation(new_settings['saturation'])
-        new_settings['sharpness'] = CameraConfig.validate_sharpness(new_settings['sharpness'])
 
         # Simülasyon modu
         if not self._initialized['camera'] or self.camera is None:
-            return self._generate_test_frame(**new_settings)
+            return self._generate_test_frame(**new_settings._asdict())
+
+        start_ns = time.monotonic_ns()
 
         # Kilit al
         if not self._locks['camera'].acquire(timeout=AppConfig.LOCK_TIMEOUT):
@@ -497,152 +932,398 @@ class HardwareManager:
             return self.frame_buffer.get_latest()
 
         try:
-            # Hash hesapla ve değişiklik kontrolü
-            new_hash = self._calculate_settings_hash(**new_settings)
 
             # *** YENİ: v3.17 DEĞİŞİKLİĞİ ***
             needs_retry = False # Flag
 
-            if new_hash != self._settings_hash:
+            if new_settings != self._settings_key:
                 logger.info("🔄 Kamera ayarları değişti, yeniden yapılandırılıyor...")
-                self._reconfigure_camera(new_settings)
-                self._settings_hash = new_hash
-                self._camera_settings_cache = new_settings.copy()
-                needs_retry = True # Ayar değişti, ilk kare riskli olabilir
+                # Yalnızca akış yeniden başlatıldıysa ilk kare riskli olabilir
+                needs_retry = self._reconfigure_camera(new_settings)
+                self._settings_key = new_settings
+                self._current_settings = new_settings
             # *** DEĞİŞİKLİK SONU ***
 
-            # Frame yakala
-            frame = self.camera.capture_array()
+            # Ham kareyi al (lens düzeltme kilit dışında yapılır)
+            correct = apply_lens_correction and CameraConfig.ENABLE_LENS_CORRECTION
+            raw = self._grab_main_frame(correct)
 
-            # *** YENİ: v3.17 DEĞİŞİKLİĞİ (SAVUNMACI YAKALAMA) ***
-            if (frame is None or frame.size == 0) and needs_retry:
-                logger.warning("Yeniden yapılandırma sonrası ilk kare başarısız. 0.5sn beklenip tekrar denenecek...")
-                time.sleep(0.5)
-                frame = self.camera.capture_array() # Tekrar dene
-            # *** DEĞİŞİKLİK SONU ***
+            retry_pending = self._is_empty_frame(raw) and needs_retry
 
-            if frame is not None and frame.size > 0:
-                # Lens düzeltme
-                if apply_lens_correction and CameraConfig.ENABLE_LENS_CORRECTION:
-                    frame = self.fisheye_corrector.correct_distortion(frame, method='fast')
+        except Exception as e:
+            logger.error(f"Görüntü alma hatası: {e}", exc_info=True)
+            self.metrics['errors'] += 1
+            return self.frame_buffer.get_latest()
+
+        finally:
+            self._locks['camera'].release()
+
+        # *** YENİ: v3.17 DEĞİŞİKLİĞİ (SAVUNMACI YAKALAMA) ***
+        # Bekleme kilit dışında: diğer kamera kullanıcıları 0.5 sn bloklanmaz
+        if retry_pending:
+            logger.warning("Yeniden yapılandırma sonrası ilk kare başarısız. 0.5sn beklenip tekrar denenecek...")
+            time.sleep(0.5)
+            if not self._locks['camera'].acquire(timeout=AppConfig.LOCK_TIMEOUT):
+                logger.warning("Kamera kilidi alınamadı (timeout)")
+                return self.frame_buffer.get_latest()
+            try:
+                raw = self._grab_main_frame(correct) # Tekrar dene
+            except Exception as e:
+                logger.error(f"Görüntü alma hatası: {e}", exc_info=True)
+                self.metrics['errors'] += 1
+                return self.frame_buffer.get_latest()
+            finally:
+                self._locks['camera'].release()
+        # *** DEĞİŞİKLİK SONU ***
+
+        # Lens düzeltme/renk dönüşümü kamera kilidi bırakıldıktan sonra: diğer kamera kullanıcıları remap'i beklemez
+        try:
+            frame = self._finish_main_frame(raw, correct, new_settings.resolution)
 
+            if frame is not None and frame.size > 0:
                 self.metrics['camera_frames'] += 1
-                self.frame_buffer.add_frame(frame)
-                self.performance_monitor.record('capture_frame', time.time())
+                added = self.frame_buffer.add_frame(
+                    frame,
+                    exposure=new_settings.exposure_time,
+                    gain=new_settings.analogue_gain,
+                    framerate=new_settings.framerate
+                )
+                if added and CameraConfig.ENABLE_SHARED_FRAMES:
+                    self._publish_shared_frame(frame)
+                self.performance_monitor.record('capture_frame', (time.monotonic_ns() - start_ns) / 1e6)  # ms
                 return frame
             else:
                 logger.warning("Frame alınamadı, test frame döndürülüyor")
-                return self._generate_test_frame(**new_settings)
+                return self._generate_test_frame(**new_settings._asdict())
 
         except Exception as e:
-            logger.error(f"Görüntü alma hatası: {e}", exc_info=True)
+            logger.error(f"Görüntü işleme hatası: {e}", exc_info=True)
             self.metrics['errors'] += 1
             return self.frame_buffer.get_latest()
 
+    def capture_frame_async(self, **kwargs) -> Future:
+        """
+        capture_frame()'i 'camera' iş kuyruğunda çalıştır (lens düzeltme dahil); Future döndürür.
+        İş kuyrukları kapalıysa (cleanup_all sonrası) kare bu thread'de alınır ve tamamlanmış bir Future döner
+        (hata bu durumda da future.result()'ta yükselir).
+        """
+        future = Future()
+        if not self.submit('camera', self._run_into_future, future, self.capture_frame, kwargs):
+            self._run_into_future(future, self.capture_frame, kwargs)
+        return future
+
+    @staticmethod
+    def _run_into_future(future: Future, fn: Callable, kwargs: Dict[str, Any]):
+        """fn(**kwargs) sonucunu (veya hatasını) Future'a yaz"""
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(**kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def submit(self, name: str, fn: Callable, *args) -> bool:
+        """
+        fn(*args) işini adı verilen cihaz kuyruğuna ekle (sırayla, o kuyruğun tek thread'inde çalışır).
+        Kuyruklar kapalıysa iş eklenmez ve False döner.
+        """
+        work_queue = self._work_queues.get(name)
+        if work_queue is None or not self._workers_running:
+            with self._workers_lock:
+                if not self._workers_running:
+                    return False
+                work_queue = self._work_queues.get(name)
+                if work_queue is None:
+                    work_queue = SimpleQueue()
+                    worker = threading.Thread(
+                        target=self._worker_loop, args=(name, work_queue), daemon=True, name=f"hw-{name}"
+                    )
+                    self._workers[name] = worker
+                    self._work_queues[name] = work_queue
+                    worker.start()
+        work_queue.put((fn, args))
+        return True
+
+    @staticmethod
+    def _worker_loop(name: str, work_queue: SimpleQueue):
+        """Cihaz kuyruğu işleyicisi (None gelince durur)"""
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            fn, args = item
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"'{name}' iş kuyruğu hatası: {e}")
+
+    def _stop_workers(self, timeout: float = 5.0):
+        """Cihaz kuyruklarını sıradaki işler bittikten sonra durdur (yeni iş kabul edilmez)"""
+        with self._workers_lock:
+            self._workers_running = False
+            work_queues = list(self._work_queues.values())
+            workers = list(self._workers.values())
+            self._work_queues.clear()
+            self._workers.clear()
+        for work_queue in work_queues:
+            work_queue.put(None)
+        for worker in workers:
+            worker.join(timeout=timeout)
+
+    def _publish_shared_frame(self, frame: np.ndarray):
+        """Kareyi paylaşımlı bellek halkasına yaz (çözünürlük değişince segment yeniden oluşturulur)"""
+        if SharedFrameRing is None:
+            return
+        try:
+            ring = self._shared_frames
+            if ring is None or ring.frame_shape != frame.shape:
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing(
+                    CameraConfig.SHARED_FRAME_NAME, CameraConfig.SHARED_FRAME_SLOTS, frame.shape
+                )
+                self._shared_frames = ring
+                logger.info(f"✓ Paylaşımlı kare tamponu: /dev/shm/{ring.name} {frame.shape}")
+            ring.publish(frame)
+        except Exception as e:
+            logger.error(f"Paylaşımlı kare yayını hatası: {e}")
+            self._shared_frames = None
+
+    def _grab_main_frame(self, apply_lens_correction: bool):
+        """
+        Ana akıştan ham kareyi al (kamera kilidi çağıran tarafından tutulur).
+        RGB akışında lens düzeltme açıksa kopyasız işlenmek üzere request döner, aksi halde dizi.
+        """
+        if apply_lens_correction and MappedArray is not None and CameraConfig.PIXEL_FORMAT != "YUV420":
+            return self.camera.capture_request()
+        return self.camera.capture_array()
+
+    @staticmethod
+    def _is_empty_frame(raw) -> bool:
+        """Ham kare boş mu? (request nesneleri boş sayılmaz)"""
+        return raw is None or (isinstance(raw, np.ndarray) and raw.size == 0)
+
+    def _finish_main_frame(self, raw, apply_lens_correction: bool,
+                           resolution: Tuple[int, int]) -> Optional[np.ndarray]:
+        """
+        Ham kareyi son haline getir (kilit gerekmez).
+        Request ise remap doğrudan istek tamponundan okur; capture_array()'in tam kare ara kopyası ve
+        tahsisi atlanır, dönen kare remap'in kendi çıktısıdır. Request her durumda bırakılır.
+        """
+        if self._is_empty_frame(raw):
+            return raw
+
+        if isinstance(raw, np.ndarray):
+            frame = raw
+            if CameraConfig.PIXEL_FORMAT == "YUV420":
+                frame = self._yuv420_to_bgr(raw, *resolution)
+            if apply_lens_correction:
+                frame = self.fisheye_corrector.correct_distortion(frame, method='fast')
+            return frame
+
+        try:
+            with MappedArray(raw, 'main') as mapped:
+                source = mapped.array
+                frame = self.fisheye_corrector.correct_distortion(source, method='fast')
+                # Düzeltici kareyi olduğu gibi döndürdüyse tampon geri verilmeden önce kopyala
+                if frame is source:
+                    frame = source.copy()
+        finally:
+            raw.release()
+        return frame
+
+    @staticmethod
+    def _yuv420_to_bgr(raw: np.ndarray, width: int, height: int) -> np.ndarray:
+        """
+        picamera2 YUV420 dizisini ((H * 3/2, stride) şeklinde) BGR'ye çevir.
+        Satır hizalama dolgusu varsa düzlemler önce sıkıştırılır (U/V satırları stride/2 bayttır).
+        """
+        import cv2
+
+        stride = raw.shape[1]
+        if stride != width:
+            y_plane = raw[:height, :width]
+            uv_planes = raw.reshape(-1)[height * stride:].reshape(height, stride // 2)[:, :width // 2]
+            raw = np.concatenate((y_plane.reshape(-1), uv_planes.reshape(-1))).reshape(height * 3 // 2, width)
+        return cv2.cvtColor(raw, cv2.COLOR_YUV2BGR_I420)
+
+    def capture_luma_frame(self, apply_lens_correction: bool = True) -> Optional[np.ndarray]:
+        """
+        Yalnızca parlaklık (gri) görüntüsünü al.
+        Ana akış YUV420 ise ya da grayscale_only açıkken (lores) YUV420 tamponunun Y düzlemi doğrudan eşlenir;
+        yalnızca W*H bayt kopyalanır (RGB yakalama + gri dönüşümünün üçte biri). Kopya şarttır: tampon request
+        bırakılınca geri verilir.
+        """
+        correct = apply_lens_correction and CameraConfig.ENABLE_LENS_CORRECTION
+        if CameraConfig.PIXEL_FORMAT == "YUV420":
+            yuv_stream = 'main'
+        else:
+            yuv_stream = 'lores' if self.grayscale_only else None
+
+        if not self._initialized['camera'] or self.camera is None or yuv_stream is None or MappedArray is None:
+            if not self._initialized['camera'] or self.camera is None:
+                frame = self._generate_test_frame(**self._current_settings._asdict())
+            else:
+                frame = self.capture_frame(apply_lens_correction=False)
+            if frame is None:
+                return None
+            # Lens düzeltme ve gri dönüşümü tek geçişte
+            if correct:
+                return self.fisheye_corrector.correct_distortion_gray(frame)
+            import cv2
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        if not self._locks['camera'].acquire(timeout=AppConfig.LOCK_TIMEOUT):
+            logger.warning("Kamera kilidi alınamadı (timeout)")
+            return None
+
+        try:
+            width, height = self._current_settings.resolution
+            request = self.camera.capture_request()
+            try:
+                with MappedArray(request, yuv_stream) as mapped:
+                    # YUV420 dizisi (H * 3/2, stride) şeklindedir; ilk H satırın ilk W sütunu Y düzlemidir
+                    luma = mapped.array[:height, :width].copy()
+            finally:
+                request.release()
+            self.metrics['camera_frames'] += 1
+            if correct:
+                return self.fisheye_corrector.correct_distortion(luma, method='fast')
+            return luma
+        except Exception as e:
+            logger.error(f"Gri görüntü alma hatası: {e}")
+            self.metrics['errors'] += 1
+            return None
         finally:
             self._locks['camera'].release()
 
-    def _reconfigure_camera(self, settings: Dict[str, Any]):
+    def _reconfigure_camera(self, settings: CaptureSettings) -> bool:
         """
         Kamerayı yeni ayarlarla yeniden yapılandır
 
         Stratejik karar:
         - Çözünürlük veya FPS değişirse → Tam yeniden başlatma
-        - Sadece image parameters değişirse → set_controls() kullan
+        - Sadece image parameters değişirse → set_controls() ile yalnızca değişen kontroller (beklemesiz)
+
+        Returns:
+            bool: Akış yeniden başlatıldıysa True
         """
         try:
             # "Ağır" değişiklikler (stream yeniden başlatma gerektirir)
             heavy_changes = (
-                    settings['resolution'] != self._camera_settings_cache['resolution'] or
-                    settings['framerate'] != self._camera_settings_cache['framerate']
+                    settings.resolution != self._current_settings.resolution or
+                    settings.framerate != self._current_settings.framerate
             )
 
             if heavy_changes:
-                logger.info(f"🔄 Tam yeniden yapılandırma: {settings['resolution']} @ {settings['framerate']}fps")
+                logger.info(f"🔄 Tam yeniden yapılandırma: {settings.resolution} @ {settings.framerate}fps")
 
                 self.camera.stop()
 
                 # Yeni kontroller
                 try:
-                    camera_controls = CameraConfig.get_camera_settings(**settings)
+                    camera_controls = dict(_controls_from_key(settings))
                 except TypeError as e:
                     logger.warning(f"Config uyumsuzluğu: {e}. Temel ayarlar kullanılıyor.")
                     camera_controls = {
-                        "FrameRate": settings['framerate'],
-                        "AeEnable": settings['ae_enable'],
-                        "AwbEnable": settings['awb_enable'],
+                        "FrameRate": settings.framerate,
+                        "AeEnable": settings.ae_enable,
+                        "AwbEnable": settings.awb_enable,
                     }
 
-                new_config = self.camera.create_video_configuration(
-                    main={"size": settings['resolution'], "format": "RGB888"},
-                    controls=camera_controls
-                )
+                new_config = self._create_video_configuration(settings.resolution, camera_controls)
 
                 self.camera.configure(new_config)
                 self.camera.start()
+                self._camera_controls = camera_controls
+                if CameraConfig.ENABLE_LENS_CORRECTION:
+                    self.fisheye_corrector.preload(settings.resolution)
                 time.sleep(1.0)  # Stabilizasyon
 
             else:
                 # "Hafif" değişiklikler (sadece kontroller)
-                logger.info("⚡ Hafif güncelleme: set_controls() kullanılıyor")
+                logger.debug("⚡ Hafif güncelleme: set_controls() kullanılıyor")
 
                 try:
-                    controls_update = CameraConfig.get_camera_settings(**settings)
-                    self.camera.set_controls(controls_update)
-                    time.sleep(0.3)  # Kısa bekleme
+                    controls = _controls_from_key(settings)
+                    previous = self._camera_controls or {}
+                    # picamera2 kontrolleri bir sonraki isteğe kendi thread'inde uygular; beklemeye gerek yok
+                    delta = {k: v for k, v in controls.items() if previous.get(k) != v}
+                    if delta:
+                        self.camera.set_controls(delta)
+                    self._camera_controls = controls
                 except TypeError as e:
                     logger.warning(f"set_controls hatası: {e}")
                     # Fallback: Temel kontroller
                     self.camera.set_controls({
-                        "AeEnable": settings['ae_enable'],
-                        "AwbEnable": settings['awb_enable'],
-                        "Brightness": settings['brightness'],
-                        "Contrast": settings['contrast'],
-                        "Saturation": settings['saturation'],
-                        "Sharpness": settings['sharpness'],
+                        "AeEnable": settings.ae_enable,
+                        "AwbEnable": settings.awb_enable,
+                        "Brightness": settings.brightness,
+                        "Contrast": settings.contrast,
+                        "Saturation": settings.saturation,
+                        "Sharpness": settings.sharpness,
                     })
+                    self._camera_controls = None
 
-            logger.info("✓ Kamera yeniden yapılandırıldı")
+            logger.debug("✓ Kamera yeniden yapılandırıldı")
+            return heavy_changes
 
         except Exception as e:
             logger.error(f"Yeniden yapılandırma hatası: {e}", exc_info=True)
             raise
 
+    def _get_test_frame_background(self, width: int, height: int) -> np.ndarray:
+        """Gradient, çapraz çizgiler ve FOV işaretlerini içeren arka planı döndür (çözünürlük başına cache'li)"""
+        import cv2
+
+        key = (width, height)
+        bg = self._testframe_bg_cache.get(key)
+        if bg is not None:
+            return bg
+
+        # Gradient arka plan: (H, 3) renk sütunu bir kez hesaplanıp tüm genişliğe yayınlanır
+        t = np.arange(height) / height
+        column = np.empty((height, 3), dtype=np.uint8)
+        column[:, 0] = 50 + (t * 100).astype(np.int64)
+        column[:, 1] = 100 + (t * 80).astype(np.int64)
+        column[:, 2] = 150 - (t * 100).astype(np.int64)
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:] = column[:, None, :]
+
+        # Çapraz çizgiler
+        center_x, center_y = width // 2, height // 2
+        cv2.line(frame, (center_x, 0), (center_x, height), (0, 255, 0), 2)
+        cv2.line(frame, (0, center_y), (width, center_y), (0, 255, 0), 2)
+
+        # FOV işaretleri (x konumları tek vektör işlemiyle)
+        xs = (center_x + (width / 2) * _FOV_MARKER_TAN).astype(np.int64)
+        for angle, x in zip(_FOV_MARKER_ANGLES, xs.tolist()):
+            if 0 <= x < width:
+                cv2.line(frame, (x, 0), (x, height), (255, 255, 0), 1)
+                cv2.putText(
+                    frame, f"{angle}°", (x - 15, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1
+                )
+
+        frame.setflags(write=False)
+        self._testframe_bg_cache[key] = frame
+        return frame
+
     def _generate_test_frame(self, **settings) -> Optional[np.ndarray]:
         """
         Simülasyon frame'i (tüm ayarlar görünür)
+        Arka plan ve ayar yazıları cache'ten kopyalanır; her çağrıda yalnızca saat, hareketli obje ve
+        motor/sensör durumu çizilir.
         """
+        import cv2  # OpenCV yalnızca simülasyon/gri yolunda gerekli; modül yüklenirken açılmaz
+
         try:
             resolution = settings.get('resolution', (1296, 972))
             width, height = resolution
-
-            # Gradient arka plan
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
-            for i in range(height):
-                frame[i, :] = [
-                    50 + int(i / height * 100),
-                    100 + int(i / height * 80),
-                    150 - int(i / height * 100)
-                ]
-
-            # Çapraz çizgiler
             center_x, center_y = width // 2, height // 2
-            cv2.line(frame, (center_x, 0), (center_x, height), (0, 255, 0), 2)
-            cv2.line(frame, (0, center_y), (width, center_y), (0, 255, 0), 2)
-
-            # FOV işaretleri
-            fov_angles = [-65, -45, -30, -15, 0, 15, 30, 45, 65]
-            for angle in fov_angles:
-                x = int(center_x + (width / 2) * np.tan(np.radians(angle)) / np.tan(np.radians(65)))
-                if 0 <= x < width:
-                    cv2.line(frame, (x, 0), (x, height), (255, 255, 0), 1)
-                    cv2.putText(
-                        frame, f"{angle}°", (x - 15, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1
-                    )
 
-            # === Ayar Bilgileri ===
-            info_texts = [
+            # === Ayar Bilgileri (saat hariç; saat satırı her karede çizilir) ===
+            info_texts = (
                 "OV5647 130° SİMÜLASYON MODU",
                 f"Çözünürlük: {width}x{height}",
                 f"FPS: {settings.get('framerate', 30):.1f}",
@@ -655,18 +1336,37 @@ class HardwareManager:
                 f"Kontrast: {settings.get('contrast', 1.0):.1f}",
                 f"Doygunluk: {settings.get('saturation', 1.0):.1f}",
                 f"Keskinlik: {settings.get('sharpness', 1.0):.1f}",
-                f"Zaman: {datetime.now().strftime('%H:%M:%S')}",
+                None,  # Zaman
                 "⚠️ Kamera takılı değil!"
-            ]
+            )
 
-            y_pos = 80
-            for text in info_texts:
-                color = (0, 255, 255) if "takılı değil" in text else (255, 255, 255)
-                cv2.putText(
-                    frame, text, (30, y_pos),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1
-                )
-                y_pos += 25
+            static_key = (width, height, info_texts)
+            cached = self._testframe_static
+            if cached is None or cached[0] != static_key:
+                static = self._get_test_frame_background(width, height).copy()
+                y_pos = 80
+                for text in info_texts:
+                    if text is not None:
+                        color = (0, 255, 255) if "takılı değil" in text else (255, 255, 255)
+                        cv2.putText(
+                            static, text, (30, y_pos),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1
+                        )
+                    y_pos += 25
+                static.setflags(write=False)
+                cached = (static_key, static)
+                self._testframe_static = cached
+
+            # Kopya: çağıranlar kareyi saklayabilir/farklı thread'lerden isteyebilir
+            frame = cached[1].copy()
+            now_ns = time.monotonic_ns()
+            if now_ns - self._last_ts_ns > 100_000_000:
+                self._last_ts_str = f"Zaman: {datetime.now().strftime('%H:%M:%S')}"
+                self._last_ts_ns = now_ns
+            cv2.putText(
+                frame, self._last_ts_str, (30, 80 + 25 * info_texts.index(None)),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1
+            )
 
             # Hareketli obje
             angle = (time.time() * 50) % 360
@@ -676,7 +1376,7 @@ class HardwareManager:
             cv2.circle(frame, (obj_x, obj_y), 30, (0, 0, 255), -1)
 
             # Motor ve sensör durumu
-            motor_angle = self.get_motor_angle()
+            motor_angle = self._motor_snapshot.angle
             distance = self.current_distance or 0
 
             status_text = [
@@ -777,7 +1477,11 @@ class HardwareManager:
                 self.camera = None
                 self._initialized['camera'] = False
                 self.frame_buffer.clear()
-                self._settings_hash = None
+                self._settings_key = None
+                self._camera_controls = None
+                if self._shared_frames is not None:
+                    self._shared_frames.close()
+                    self._shared_frames = None
                 logger.info("✓ Kamera temizlendi")
         except Exception as e:
             logger.error(f"Kamera temizleme hatası: {e}")
@@ -803,38 +1507,43 @@ class HardwareManager:
 
         # ✅ BURADAN SONRASI AYNI (Değiştirme!)
         def _init_motor():
-            if self.motor_devices:
+            if self.motor_devices or self._motor_pins:
                 self.cleanup_motor()
 
             logger.info("🔧 Step motor başlatılıyor...")
             logger.info(f"   GPIO Pinler: IN1={MotorConfig.H_MOTOR_IN1}, IN2={MotorConfig.H_MOTOR_IN2}, IN3={MotorConfig.H_MOTOR_IN3}, IN4={MotorConfig.H_MOTOR_IN4}")
 
-            self.motor_devices = (
-                OutputDevice(MotorConfig.H_MOTOR_IN1),
-                OutputDevice(MotorConfig.H_MOTOR_IN2),
-                OutputDevice(MotorConfig.H_MOTOR_IN3),
-                OutputDevice(MotorConfig.H_MOTOR_IN4)
-            )
+            pins = (MotorConfig.H_MOTOR_IN1, MotorConfig.H_MOTOR_IN2,
+                    MotorConfig.H_MOTOR_IN3, MotorConfig.H_MOTOR_IN4)
+            if njit is not None and MotorConfig.USE_NATIVE_STEP_LOOP:
+                try:
+                    self._motor_pins = NativeMotorPinGroup(MotorConfig.GPIO_CHIP, pins)
+                    logger.info(f"   Pin yazma: derlenmiş adım döngüsü (liblgpio, gpiochip{MotorConfig.GPIO_CHIP})")
+                except Exception as e:
+                    logger.warning(f"Derlenmiş adım döngüsü kullanılamıyor ({e})")
+                    self._motor_pins = None
+
+            if self._motor_pins is None and lgpio is not None and MotorConfig.USE_GPIO_GROUP_WRITE:
+                try:
+                    self._motor_pins = MotorPinGroup(MotorConfig.GPIO_CHIP, pins)
+                    logger.info(f"   Pin yazma: lgpio grubu (gpiochip{MotorConfig.GPIO_CHIP})")
+                except Exception as e:
+                    logger.warning(f"lgpio grubu açılamadı ({e}), gpiozero cihazları kullanılıyor")
+                    self._motor_pins = None
+
+            if self._motor_pins is None:
+                self.motor_devices = tuple(OutputDevice(pin) for pin in pins)
 
             if MotorConfig.LIMIT_SWITCH_MIN:
-                self.limit_switches['min'] = Button(MotorConfig.LIMIT_SWITCH_MIN)
+                self._bind_limit_switch('min', MotorConfig.LIMIT_SWITCH_MIN)
                 logger.info(f"   Min limit switch: GPIO{MotorConfig.LIMIT_SWITCH_MIN}")
 
             if MotorConfig.LIMIT_SWITCH_MAX:
-                self.limit_switches['max'] = Button(MotorConfig.LIMIT_SWITCH_MAX)
+                self._bind_limit_switch('max', MotorConfig.LIMIT_SWITCH_MAX)
                 logger.info(f"   Max limit switch: GPIO{MotorConfig.LIMIT_SWITCH_MAX}")
 
-            self.motor_ctx = {
-                'current_angle': 0.0,
-                'sequence_index': 0,
-                'total_steps': 0,
-                'is_moving': False,
-                'last_direction': None,
-                'target_angle': 0.0,
-                'cancel_movement': False,
-                'speed_profile': 'normal',
-                'backlash_compensation': MotorConfig.BACKLASH_COMPENSATION
-            }
+            self.motor_ctx = MotorContext()
+            self._publish_motor_snapshot()
 
             self._stop_motor_internal()
 
@@ -867,25 +1576,34 @@ class HardwareManager:
 
         while self.motor_queue_running:
             try:
-                command = self.motor_command_queue.get_next()
+                # Önceki hareket sürerken biriken hedefler (ör. slider sürükleme) son hedefe indirgenir
+                if MotorConfig.COALESCE_COMMANDS and self.motor_command_queue.size() > 1:
+                    dropped = self.motor_command_queue.coalesce()
+                    if dropped:
+                        logger.debug("Ara motor hedefleri atlandı: %d komut", dropped)
+
+                # Komut gelene kadar uyur (10 ms'lik yoklama yerine); durdurma bayrağı 0.5 sn'de bir kontrol edilir
+                command = self.motor_command_queue.get_next(timeout=0.5)
                 if command:
-                    target_angle = command['angle']
-                    callback = command.get('callback')
+                    target_angle = command.angle
+                    callback = command.callback
+                    self.motor_command_queue.release(command)
 
                     # ASENKRON ÇAĞRI: Kilit motor thread'i tarafından alınır
                     success = self._move_to_angle_internal(target_angle, from_queue=True)
 
-                    if callback:
-                        try:
-                            callback(success, target_angle)
-                        except Exception as e:
-                            logger.error(f"Motor callback hatası: {e}")
-
-                time.sleep(0.01) # CPU kullanımı için kısa bir bekleme
+                    # Callback ayrı kuyrukta: yavaş bir callback sıradaki motor komutunu geciktirmez
+                    if callback and not self.submit('motor_callback', callback, success, target_angle):
+                        callback(success, target_angle)
             except Exception as e:
                 logger.error(f"Motor komut işleme hatası: {e}")
                 time.sleep(0.1)
+            finally:
+                # Hata/iptal dahil her turda: kuyruk boşsa bekleyenler zaman aşımını beklemeden uyanır
+                if self.motor_command_queue.size() == 0:
+                    self._motor_idle.set()
 
+        self._motor_idle.set()
         logger.info("Motor komut işleyici durdu")
 
     @profile_performance
@@ -917,50 +1635,62 @@ class HardwareManager:
             # self.initialize_motor() # Dikkatli kullanılmalı
             return False
 
-        logger.info(f"📡 move_to_angle() çağrıldı: {target_angle}° (speed={speed_profile}, force={force}, wait={wait})")
+        logger.debug("📡 move_to_angle() çağrıldı: %s° (speed=%s, force=%s, wait=%s)",
+                     target_angle, speed_profile, force, wait)
 
         # Force mode
         if force:
             logger.info("🛑 Force mode: Mevcut komutlar iptal ediliyor...")
-            self.motor_ctx['cancel_movement'] = True
+            self._signal_motor_cancel()
             self.motor_command_queue.clear()
             # Kısa bir bekleme, çalışan thread'in iptali fark etmesi için
             time.sleep(0.05)
 
-        self.motor_ctx['speed_profile'] = speed_profile
+        self.motor_ctx.speed_profile = speed_profile
 
-        # Komutu kuyruğa ekle
-        self.motor_command_queue.add_command(target_angle, priority, callback)
-        logger.info(f"✅ Komut kuyruğa eklendi. Queue boyutu: {self.motor_command_queue.size()}")
+        # Komutu kuyruğa ekle (bekleyenler komut işlenene kadar uyusun diye önce temizlenir)
+        self._motor_idle.clear()
+        self.motor_command_queue.add_command(target_angle, priority, callback, waited=wait and not callback)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ Komut kuyruğa eklendi. Queue boyutu: %d", self.motor_command_queue.size())
 
         # ✅ SENKRON BEKLEME (Sadece gerekliyse)
         if wait and not callback:
-            logger.info(f"⏳ Senkron bekleme başladı (timeout={timeout}s)...")
-            start_time = time.time()
-            last_log = 0
-
-            while time.time() - start_time < timeout:
-                current = self.motor_ctx['current_angle']
-                is_moving = self.motor_ctx['is_moving']
-                queue_size = self.motor_command_queue.size()
-                diff = abs(current - target_angle)
-
-                # Hedefe ulaştı mı? (Hareket bitti VE kuyruk boş VE hedefe yakın)
-                if not is_moving and queue_size == 0 and diff < 0.5:
-                    elapsed = time.time() - start_time
-                    logger.info(f"✅ Motor hedefte: {current:.1f}° (Süre: {elapsed:.2f}s)")
-                    return True
+            logger.debug("⏳ Senkron bekleme başladı (timeout=%ss)...", timeout)
+            start_time = time.monotonic()
+            deadline = start_time + timeout
 
-                # Her saniye log
-                now = time.time()
-                if now - last_log >= 1.0:
-                    logger.info(f"   ⏳ Bekliyor... Açı: {current:.1f}° | Hedef: {target_angle:.1f}° | Hareket: {is_moving} | Kuyruk: {queue_size}")
-                    last_log = now
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                # Motor thread'i kuyruğu bitirince uyandırır; saniyede bir ilerleme loglanır
+                if not self._motor_idle.wait(min(remaining, 1.0)):
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("   ⏳ Bekliyor... Açı: %.1f° | Hedef: %.1f° | Hareket: %s | Kuyruk: %d",
+                                     self.motor_ctx.current_angle, target_angle,
+                                     self.motor_ctx.is_moving, self.motor_command_queue.size())
+                    continue
+
+                current = self.motor_ctx.current_angle
+                # Başka bir çağıran araya yeni komut eklediyse beklemeye devam et
+                # (olay set ile yeni komut arasında yarışa düştüyse kısa bir yoklamayla)
+                if self.motor_ctx.is_moving or self.motor_command_queue.size() > 0:
+                    time.sleep(0.05)
+                    continue
+
+                if abs(current - target_angle) < 0.5:
+                    elapsed = time.monotonic() - start_time
+                    logger.debug("✅ Motor hedefte: %.1f° (Süre: %.2fs)", current, elapsed)
+                    return True
 
-                time.sleep(0.05)
+                # Kuyruk bitti ama hedefe varılamadı (iptal/limit/hata): zaman aşımını beklemeye gerek yok
+                logger.error(f"⚠️ Motor hedefe ulaşamadı! Son açı: {current:.1f}° | Hedef: {target_angle:.1f}°")
+                return False
 
             # Timeout
-            logger.error(f"⚠️ Motor hareketi TIMEOUT! Son açı: {self.motor_ctx['current_angle']:.1f}°")
+            logger.error(f"⚠️ Motor hareketi TIMEOUT! Son açı: {self.motor_ctx.current_angle:.1f}°")
             return False
 
         # Asenkron mod (wait=False)
@@ -978,36 +1708,34 @@ class HardwareManager:
             return False
 
         try:
-            self.motor_ctx['is_moving'] = True
-            self.motor_ctx['target_angle'] = target_angle
-            self.motor_ctx['cancel_movement'] = False
-
-            current = self.motor_ctx['current_angle']
-            deg_per_step = 360.0 / MotorConfig.STEPS_PER_REV
-            angle_diff = target_angle - current
+            self.motor_ctx.is_moving = True
+            self.motor_ctx.target_angle = target_angle
+            self.motor_ctx.cancel_movement = False
+            self._publish_motor_snapshot()
+
+            # Hedef ve fark tamsayı adım cinsinden hesaplanır
+            steps_per_deg = MotorConfig.STEPS_PER_REV / 360.0
+            target_step = round(target_angle * steps_per_deg)
+            delta = target_step - self.motor_ctx.current_step
+
+            if delta == 0:
+                logger.debug("Motor zaten hedefte (%.1f°)", target_angle)
+                self.motor_ctx.is_moving = False
+                return True
 
             # Backlash compensation
-            if self.motor_ctx['last_direction'] is not None:
-                new_direction = (angle_diff > 0)
-                if new_direction != self.motor_ctx['last_direction']:
-                    compensation = self.motor_ctx.get('backlash_compensation', MotorConfig.BACKLASH_COMPENSATION)
-                    if new_direction:
-                        angle_diff += compensation
-                    else:
-                        angle_diff -= compensation
+            direction = (delta > 0)
+            if self.motor_ctx.last_direction is not None and direction != self.motor_ctx.last_direction:
+                backlash_steps = round(self.motor_ctx.backlash_compensation * steps_per_deg)
+                delta += backlash_steps if direction else -backlash_steps
 
-            if abs(angle_diff) < deg_per_step / 2:
-                logger.debug(f"Motor zaten hedefte ({target_angle:.1f}°)")
-                self.motor_ctx['is_moving'] = False
-                return True
-
-            logger.info(f"🔄 Motor: {current:.1f}° → {target_angle:.1f}° (Δ={angle_diff:.1f}°)")
+            angle_diff = delta / steps_per_deg
+            logger.debug("🔄 Motor: %.1f° → %.1f° (Δ=%.1f°)", self.motor_ctx.current_angle, target_angle, angle_diff)
 
-            num_steps = round(abs(angle_diff) / deg_per_step)
-            direction = (angle_diff > 0)
+            num_steps = abs(delta)
 
             profile = MotorConfig.SPEED_PROFILES.get(
-                self.motor_ctx['speed_profile'],
+                self.motor_ctx.speed_profile,
                 MotorConfig.SPEED_PROFILES['normal']
             )
 
@@ -1015,18 +1743,24 @@ class HardwareManager:
             acceleration = profile['acceleration']
 
             success = self._step_motor_with_acceleration(
-                num_steps, direction, step_delay, deg_per_step, acceleration
+                num_steps, direction, step_delay, acceleration
             )
 
             if success:
-                self.motor_ctx['current_angle'] = target_angle
-                self.motor_ctx['last_direction'] = direction
+                self.motor_ctx.current_step = target_step
+                self.motor_ctx.last_direction = direction
+                self._publish_motor_snapshot()
                 self.metrics['motor_moves'] += 1
-                time.sleep(MotorConfig.SETTLE_TIME)
-                logger.info(f"✓ Motor hedefte: {target_angle:.1f}°")
+                # Oturma beklemesi yalnızca durulacaksa gerekir: kısa hareketlerde ve sıradaki komut aynı yönde
+                # devam ediyorsa (boşluk/backlash yok) atlanır
+                next_angle = self.motor_command_queue.peek_angle()
+                continues = next_angle is not None and (next_angle > target_angle) == direction
+                if num_steps > MotorConfig.SETTLE_MIN_STEPS and not continues:
+                    time.sleep(MotorConfig.SETTLE_TIME)
+                logger.debug("✓ Motor hedefte: %.1f°", target_angle)
                 self.performance_monitor.record('motor_move', angle_diff)
-            elif self.motor_ctx['cancel_movement']:
-                logger.info(f"⚠️ Motor hareketi iptal edildi ({self.motor_ctx['current_angle']:.1f}°)")
+            elif self.motor_ctx.cancel_movement:
+                logger.info(f"⚠️ Motor hareketi iptal edildi ({self.motor_ctx.current_angle:.1f}°)")
             else:
                 logger.error("Motor hareketi başarısız")
 
@@ -1038,13 +1772,13 @@ class HardwareManager:
             return False
 
         finally:
-            self.motor_ctx['is_moving'] = False
+            self.motor_ctx.is_moving = False
+            self._publish_motor_snapshot()
             self._stop_motor_internal() # Her hareketten sonra pinleri kapat
             self._locks['motor'].release()
 
     def _step_motor_with_acceleration(self, num_steps: int, direction: bool,
-                                      base_delay: float, deg_per_step: float,
-                                      acceleration: float) -> bool:
+                                      base_delay: float, acceleration: float) -> bool:
         """Hızlanma/yavaşlama profili ile motor hareketi"""
         acceleration = min(acceleration, 1.3)
         step_increment = 1 if direction else -1
@@ -1052,73 +1786,141 @@ class HardwareManager:
         if MotorConfig.INVERT_DIRECTION:
             step_increment *= -1
 
-        angle_increment = deg_per_step * (1 if direction else -1)
-
-        accel_steps = min(100, num_steps // 4)
-        decel_steps = accel_steps
-        current_delay = base_delay * 3
+        step_sign = 1 if direction else -1
+
+        # Adım beklemeleri ve bobin dizisi indeksleri hareket başına bir kez vektörel hesaplanır;
+        # döngüde dal/çarpma kalmaz. Cihazlar yerel değişkene alınır
+        delays = _step_delay_schedule(num_steps, base_delay, acceleration)
+        sequence_len = len(MotorConfig.STEP_MASKS)
+        masks = MotorConfig.STEP_MASKS.tolist()
+        pin_group = self._motor_pins
+        indices = (self.motor_ctx.sequence_index + step_increment * np.arange(1, num_steps + 1)) % sequence_len
+        coils = self.motor_devices
+
+        if isinstance(pin_group, NativeMotorPinGroup):
+            return self._step_motor_native(pin_group, MotorConfig.STEP_MASKS, indices, delays, direction)
+
+        start_index = self.motor_ctx.sequence_index
+        delays = delays.tolist()
+        indices = indices.tolist()
+
+        # Döngüde kullanılan nitelik/metotlar bir kez yerel isimlere alınır (adım başına LOAD_ATTR kalmaz)
+        pc = time.perf_counter
+        sleep = time.sleep
+        ctx = self.motor_ctx
+        publish = self._publish_motor_snapshot
+        write = pin_group.write if pin_group is not None else None
+        limit_hit = self._limit_hit
+        limit_slot = 1 if direction else 0
+        sleep_threshold = _STEP_SLEEP_THRESHOLD
+        spin_margin = _STEP_SPIN_MARGIN
+        publish_every = _SNAPSHOT_PUBLISH_STEPS
+        # Mutlak zaman çizelgesi: her adımın bitişi bir öncekine göre hesaplanır, yazma/Python yükü birikip kaymaz
+        next_t = pc()
+        # gpiozero yolunda her adımda yalnızca değişen bobinler yazılır: geçiş tablosundan adım başına (bobin, değer)
+        # listesi hazırlanır; ilk adım pinlerin gerçek durumuna göre (hareket öncesi bobinler kapatılmış olabilir)
+        if write is None and coils and indices:
+            transitions = _STEP_TRANSITIONS[0 if step_increment > 0 else 1]
+            changes = [transitions[i] for i in [start_index] + indices[:-1]]
+            first = MotorConfig.STEP_SEQUENCE_ARR[indices[0]].astype(bool).tolist()
+            changes[0] = tuple((coil, value) for coil, value in enumerate(first) if bool(coils[coil].value) != value)
+        else:
+            changes = None
 
-        for step in range(num_steps):
-            if self.motor_ctx['cancel_movement']:
-                logger.debug(f"Hareket iptal edildi (Adım {step}/{num_steps})")
+        for step, (current_delay, idx) in enumerate(zip(delays, indices)):
+            if ctx.cancel_movement:
+                logger.debug("Hareket iptal edildi (Adım %d/%d)", step, num_steps)
                 self._stop_motor_internal()
+                publish()
                 return False
 
-            if self._check_limits(direction):
-                logger.warning(f"⚠️ Limit switch tetiklendi!")
+            if limit_hit[limit_slot]:
+                logger.warning("⚠️ Limit switch tetiklendi!")
                 self._stop_motor_internal()
+                publish()
                 return False
 
-            # Hızlanma/yavaşlama
-            if step < accel_steps:
-                progress = step / accel_steps
-                current_delay = base_delay * (3 - 2 * progress * acceleration)
-            elif step >= num_steps - decel_steps:
-                progress = (num_steps - step) / decel_steps
-                current_delay = base_delay * (3 - 2 * progress * acceleration)
-            else:
-                current_delay = base_delay
-
             # Step
-            idx = self.motor_ctx['sequence_index']
-            idx = (idx + step_increment) % len(MotorConfig.STEP_SEQUENCE)
-            self.motor_ctx['sequence_index'] = idx
+            ctx.sequence_index = idx
+
+            if write is not None:
+                write(masks[idx])
+            elif changes is not None:
+                for coil, value in changes[step]:
+                    coils[coil].value = value
+
+            ctx.current_step += step_sign
+            ctx.total_steps += 1
+            if step % publish_every == 0:
+                publish()
+
+            next_t += current_delay
+            remaining = next_t - pc()
+            if remaining > sleep_threshold:
+                sleep(remaining - spin_margin)
+            elif remaining < -current_delay:
+                # Bir adımdan fazla geride (ör. thread bekletildi): kaçırılanları art arda atmak yerine çizelgeyi kaydır
+                next_t = pc()
+            while pc() < next_t:
+                pass
 
-            self._set_motor_pins(*MotorConfig.STEP_SEQUENCE[idx])
+            if step > 0 and step % 200 == 0:
+                logger.debug("  Motor: %d/%d adım | %.1f°", step, num_steps, ctx.current_angle)
 
-            self.motor_ctx['current_angle'] += angle_increment
-            self.motor_ctx['total_steps'] += 1
+        self._stop_motor_internal()
+        publish()
+        logger.debug("✓ %d adım tamamlandı", num_steps)
+        return True
 
-            current_delay = max(0.0001, current_delay)
-            time.sleep(current_delay)
+    def _step_motor_native(self, pin_group: 'NativeMotorPinGroup', masks: np.ndarray, indices: np.ndarray,
+                           delays: np.ndarray, direction: bool) -> bool:
+        """Adımları derlenmiş döngüde at; açı/adım sayaçları hareket sonunda (veya iptalde) tek seferde güncellenir"""
+        num_steps = len(indices)
+        pin_group.cancel_flag[0] = self.motor_ctx.cancel_movement
+        limit_slot = 1 if direction else 0
+        done = pin_group.run(masks, indices, delays, self._limit_hit, limit_slot)
 
-            if step > 0 and step % 200 == 0:
-                logger.debug(f"  Motor: {step}/{num_steps} adım | {self.motor_ctx['current_angle']:.1f}°")
+        if done:
+            self.motor_ctx.sequence_index = int(indices[done - 1])
+            self.motor_ctx.current_step += done if direction else -done
+            self.motor_ctx.total_steps += done
+            self._publish_motor_snapshot()
 
         self._stop_motor_internal()
-        logger.debug(f"✓ {num_steps} adım tamamlandı")
+        if done < num_steps:
+            if self._limit_hit[limit_slot]:
+                logger.warning("⚠️ Limit switch tetiklendi!")
+            else:
+                logger.debug("Hareket iptal edildi (Adım %d/%d)", done, num_steps)
+            return False
+        logger.debug("✓ %d adım tamamlandı (derlenmiş döngü)", num_steps)
         return True
 
     def _validate_angle(self, angle: float) -> float:
         """Açıyı sınırlar içinde tut"""
         return max(MotorConfig.MIN_ANGLE, min(MotorConfig.MAX_ANGLE, angle))
 
-    def _check_limits(self, direction_positive: bool) -> bool:
-        """Limit switch kontrolü"""
-        try:
-            if direction_positive and self.limit_switches['max']:
-                if self.limit_switches['max'].is_pressed:
-                    return True
-            elif not direction_positive and self.limit_switches['min']:
-                if self.limit_switches['min'].is_pressed:
-                    return True
-        except Exception as e:
-            logger.warning(f"Limit switch okuma hatası: {e}")
-        return False
+    def _bind_limit_switch(self, name: str, pin: int):
+        """Limit switch'i oluştur; durumunu kenar callback'leriyle _limit_hit'e yansıt"""
+        slot = 1 if name == 'max' else 0
+        button = Button(pin)
+        self._limit_hit[slot] = bool(button.is_pressed)
+
+        def pressed():
+            self._limit_hit[slot] = 1
+
+        def released():
+            self._limit_hit[slot] = 0
+
+        button.when_pressed = pressed
+        button.when_released = released
+        self.limit_switches[name] = button
 
     def _set_motor_pins(self, pin1: int, pin2: int, pin3: int, pin4: int):
         """Motor pinlerini ayarla"""
-        if self.motor_devices:
+        if self._motor_pins is not None:
+            self._motor_pins.write(bool(pin1) | bool(pin2) << 1 | bool(pin3) << 2 | bool(pin4) << 3)
+        elif self.motor_devices:
             self.motor_devices[0].value = bool(pin1)
             self.motor_devices[1].value = bool(pin2)
             self.motor_devices[2].value = bool(pin3)
@@ -1126,45 +1928,59 @@ class HardwareManager:
 
     def _stop_motor_internal(self):
         """Motoru durdur (internal)"""
+        if self._motor_pins is not None:
+            self._motor_pins.off()
         if self.motor_devices:
             for dev in self.motor_devices:
                 dev.off()
 
     def cancel_movement(self):
         """Mevcut motor hareketini iptal et"""
-        if self.motor_ctx['is_moving']:
+        if self.motor_ctx.is_moving:
             logger.info("🛑 Motor hareketi iptal ediliyor...")
-            self.motor_ctx['cancel_movement'] = True
+            self._signal_motor_cancel()
         self.motor_command_queue.clear() # Kuyruktakileri de temizle
 
+    def _signal_motor_cancel(self):
+        """Süren hareketi iptal et (derlenmiş adım döngüsü kendi bayrağını okur)"""
+        self.motor_ctx.cancel_movement = True
+        pin_group = self._motor_pins
+        if isinstance(pin_group, NativeMotorPinGroup):
+            pin_group.cancel_flag[0] = 1
+
+    def _publish_motor_snapshot(self):
+        """motor_ctx'ten yeni anlık görüntü yayınla (motor kilidi tutulurken çağrılır)"""
+        ctx = self.motor_ctx
+        self._motor_snapshot = MotorSnapshot(ctx.current_angle, ctx.is_moving, ctx.target_angle)
+
     def get_motor_angle(self) -> float:
         """Mevcut motor açısını al"""
-        return self.motor_ctx['current_angle']
+        return self._motor_snapshot.angle
 
     def calibrate_motor(self):
         """Motor kalibrasyonu (home position)"""
         with self._locks['motor']:
-            self.motor_ctx['current_angle'] = 0.0
-            self.motor_ctx['sequence_index'] = 0
-            self.motor_ctx['total_steps'] = 0
+            self.motor_ctx.current_step = 0
+            self.motor_ctx.sequence_index = 0
+            self.motor_ctx.total_steps = 0
+            self._publish_motor_snapshot()
 
-            if self.motor_devices:
-                for dev in self.motor_devices:
-                    dev.off()
+            self._stop_motor_internal()
 
             logger.info("✓ Motor kalibre edildi (0°)")
 
     def get_motor_info(self) -> Dict[str, Any]:
         """Detaylı motor bilgileri"""
+        snap = self._motor_snapshot
         return {
-            'angle': self.motor_ctx['current_angle'],
-            'target_angle': self.motor_ctx['target_angle'],
-            'is_moving': self.motor_ctx['is_moving'],
-            'cancel_movement': self.motor_ctx['cancel_movement'],
-            'total_steps': self.motor_ctx['total_steps'],
-            'sequence_index': self.motor_ctx['sequence_index'],
-            'last_direction': self.motor_ctx['last_direction'],
-            'speed_profile': self.motor_ctx['speed_profile'],
+            'angle': snap.angle,
+            'target_angle': snap.target,
+            'is_moving': snap.is_moving,
+            'cancel_movement': self.motor_ctx.cancel_movement,
+            'total_steps': self.motor_ctx.total_steps,
+            'sequence_index': self.motor_ctx.sequence_index,
+            'last_direction': self.motor_ctx.last_direction,
+            'speed_profile': self.motor_ctx.speed_profile,
             'deg_per_step': 360.0 / MotorConfig.STEPS_PER_REV,
             'queue_size': self.motor_command_queue.size(),
             'queue_running': self.motor_queue_running,
@@ -1184,6 +2000,10 @@ class HardwareManager:
                     dev.close()
                 self.motor_devices = None
 
+            if self._motor_pins is not None:
+                self._motor_pins.close()
+                self._motor_pins = None
+
             self._initialized['motor'] = False
             logger.info("✓ Motor temizlendi")
         except Exception as e:
@@ -1343,71 +2163,92 @@ class HardwareManager:
         """Sensörden mesafe oku (internal, 400cm düzeltmeli)"""
         if not self._initialized['sensor'] and not GPIO_AVAILABLE:
             # Simülasyon
-            self.current_distance = np.random.uniform(10, 200)
+            self.current_distance = random.uniform(10, 200)
             return self.current_distance
 
         try:
             if not self.sensor:
                 return None
 
-            readings = []
+            buf = self._read_buf
+            count = 0
+            # Okuma başına log çağrısı (ve cm çevrimi) DEBUG kapalıyken hiç yapılmaz
+            debug = logger.isEnabledFor(logging.DEBUG)
             for attempt in range(SensorConfig.READ_ATTEMPTS):
                 try:
                     dist_m = self.sensor.distance
                     if dist_m is not None and dist_m > 0:
-                        readings.append(dist_m)
-                        logger.debug(f"  Okuma #{attempt + 1}: {dist_m * 100:.1f} cm")
-                    else:
-                        logger.debug(f"  Okuma #{attempt + 1}: None/Geçersiz")
+                        buf[count] = dist_m
+                        count += 1
+                        if debug:
+                            logger.debug("  Okuma #%d: %.1f cm", attempt + 1, dist_m * 100)
+                    elif debug:
+                        logger.debug("  Okuma #%d: None/Geçersiz", attempt + 1)
                 except Exception as e:
-                    logger.debug(f"  Okuma #{attempt + 1} hatası: {e}")
+                    if debug:
+                        logger.debug("  Okuma #%d hatası: %s", attempt + 1, e)
 
                 if attempt < SensorConfig.READ_ATTEMPTS - 1:
                     time.sleep(SensorConfig.READ_DELAY)
 
-            if not readings:
+            if count == 0:
                 logger.debug("❌ Hiç geçerli okuma yapılamadı")
                 return None
 
-            # Median veya ortalama
-            if SensorConfig.USE_MEDIAN_FILTER and len(readings) >= 3:
-                readings.sort()
-                median_dist_m = readings[len(readings) // 2]
-                logger.debug(f"📊 Median mesafe: {median_dist_m * 100:.1f} cm")
+            # Median veya ortalama (geçerli okumalar tamponun başında)
+            valid = buf[:count]
+            if SensorConfig.USE_MEDIAN_FILTER and count >= 3:
+                # Tampon karalama alanı: yerinde partition, np.median'ın kopya/sıralama yükü olmadan (~10x hızlı)
+                k = count // 2
+                if count % 2:
+                    valid.partition(k)
+                    median_dist_m = float(valid[k])
+                else:
+                    valid.partition((k - 1, k))
+                    median_dist_m = 0.5 * float(valid[k - 1] + valid[k])
+                logger.debug("📊 Median mesafe: %.1f cm", median_dist_m * 100)
             else:
-                median_dist_m = np.mean(readings)
-                logger.debug(f"📊 Ortalama mesafe: {median_dist_m * 100:.1f} cm")
-
-            dist_cm_raw = median_dist_m * 100 + SensorConfig.CALIBRATION_OFFSET
-
-            # Aralık kontrolü
-            if not (SensorConfig.MIN_VALID_DISTANCE <= dist_cm_raw <= SensorConfig.MAX_VALID_DISTANCE):
-                logger.debug(f"⚠️ Mesafe geçersiz (sınır dışı): {dist_cm_raw:.1f} cm")
-                return None
-
-            # Sıcaklık kompanzasyonu
-            if SensorConfig.TEMPERATURE_COMPENSATION:
-                sound_speed = SensorConfig.calculate_sound_speed()
-                correction_factor = sound_speed / 343.0
-                dist_cm_corrected = dist_cm_raw * correction_factor
-
-                logger.debug(f"🌡️ Sıcaklık düzeltmesi: {dist_cm_raw:.1f}cm -> {dist_cm_corrected:.1f}cm")
-
-                if not (SensorConfig.MIN_VALID_DISTANCE <= dist_cm_corrected <= SensorConfig.MAX_VALID_DISTANCE):
-                    logger.debug(f"⚠️ Düzeltilmiş mesafe geçersiz: {dist_cm_corrected:.1f} cm. Orijinal kullanılacak.")
-                    logger.debug(f"✅ Geçerli mesafe (orijinal): {dist_cm_raw:.1f} cm")
-                    return dist_cm_raw
-
-                logger.debug(f"✅ Geçerli mesafe (düzeltilmiş): {dist_cm_corrected:.1f} cm")
-                return dist_cm_corrected
-
-            logger.debug(f"✅ Geçerli mesafe: {dist_cm_raw:.1f} cm")
-            return dist_cm_raw
+                median_dist_m = float(valid.mean())
+                logger.debug("📊 Ortalama mesafe: %.1f cm", median_dist_m * 100)
+
+            # Düzeltme katsayısı ve ona göre ham birimdeki geçerli aralık 5 sn'de bir hesaplanır
+            now = time.monotonic()
+            if now > self._correction_expires_at:
+                self._update_sound_correction()
+                self._correction_expires_at = now + 5.0
+            correction = self._sound_correction
+            corr_lo, corr_hi, raw_lo, raw_hi = self._raw_valid_range
+            raw_cm = median_dist_m * 100.0
+
+            # Aralık kontrolü ham değer üzerinde; düzeltme + kalibrasyon tek çarpma-toplama
+            if corr_lo <= raw_cm <= corr_hi:
+                dist_cm = raw_cm * correction + SensorConfig.CALIBRATION_OFFSET
+                logger.debug("✅ Geçerli mesafe: %.1f cm (düzeltme x%.4f)", dist_cm, correction)
+                return dist_cm
+
+            # Düzeltilmiş değer sınır dışıysa düzeltmesiz değer denenir
+            if raw_lo <= raw_cm <= raw_hi:
+                dist_cm_raw = raw_cm + SensorConfig.CALIBRATION_OFFSET
+                logger.debug("⚠️ Düzeltilmiş mesafe geçersiz. Orijinal kullanılacak: %.1f cm", dist_cm_raw)
+                return dist_cm_raw
+
+            logger.debug("⚠️ Mesafe geçersiz (sınır dışı): %.1f cm (ham)", raw_cm)
+            return None
 
         except Exception as e:
             logger.error(f"❌ Sensör okuma hatası: {e}")
             return None
 
+    def _update_sound_correction(self):
+        """Ses hızı düzeltmesini ve geçerli mesafe aralığının ham ölçü karşılığını güncelle"""
+        correction = (
+            SensorConfig.calculate_sound_speed() / 343.0 if SensorConfig.TEMPERATURE_COMPENSATION else 1.0
+        )
+        lo = SensorConfig.MIN_VALID_DISTANCE - SensorConfig.CALIBRATION_OFFSET
+        hi = SensorConfig.MAX_VALID_DISTANCE - SensorConfig.CALIBRATION_OFFSET
+        self._sound_correction = correction
+        self._raw_valid_range = (lo / correction, hi / correction, lo, hi)
+
     def stop_continuous_sensor_reading(self):
         """Sürekli sensör okumayı durdur"""
         if not self.sensor_running:
@@ -1427,7 +2268,7 @@ class HardwareManager:
             return self.current_distance
 
         if not self._initialized['sensor'] and not GPIO_AVAILABLE:
-            return np.random.uniform(10, 200)
+            return random.uniform(10, 200)
 
         return self._read_distance_internal()
 
@@ -1466,6 +2307,10 @@ class HardwareManager:
         logger.info("TÜM DONANIM BAŞLATILIYOR")
         logger.info("=" * 60)
 
+        # Önceki cleanup_all() ile kapatılan cihaz iş kuyruklarını yeniden aç (thread'ler ilk işte başlar)
+        with self._workers_lock:
+            self._workers_running = True
+
         try:
             system_checks = SystemChecks.run_all_checks()
             for check, result in system_checks.items():
@@ -1534,6 +2379,7 @@ class HardwareManager:
             self.cleanup_motor()
             self.cleanup_sensor()
 
+        self._stop_workers()
         if self.executor:
             self.executor.shutdown(wait=True)
 
@@ -1568,9 +2414,9 @@ class HardwareManager:
                 'model': CameraConfig.CAMERA_MODEL,
                 'fov': CameraConfig.FOV_HORIZONTAL,
                 'lens_correction': CameraConfig.ENABLE_LENS_CORRECTION,
-                'buffer_size': len(self.frame_buffer.buffer) if hasattr(self, 'frame_buffer') else 0,
+                'buffer_size': len(self.frame_buffer) if hasattr(self, 'frame_buffer') else 0,
                 'settings': cache,
-                'settings_hash': self._settings_hash,
+                'settings_hash': self._calculate_settings_hash(**cache) if self._settings_key is not None else None,
             },
             'circuit_breakers': {
                 name: breaker.state
@@ -1596,6 +2442,7 @@ __all__ = [
     'hardware_manager',
     'CAMERA_AVAILABLE',
     'GPIO_AVAILABLE',
+    'MotorCommand',
     'MotorCommandQueue',
     'AdaptiveSensorReader'
 ]
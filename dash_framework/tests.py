@@ -1,3 +1,307 @@
-from django.test import TestCase
+import json
+import uuid
+from unittest import mock, skipIf
 
-# Create your tests here.
+import cv2
+import numpy as np
+import pandas as pd
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from dash_framework import dash_apps, views
+from dash_framework.hardware_manager import MotorCommandQueue, _step_delay_schedule
+from dash_framework.utils import FisheyeCorrector, FrameBuffer, SharedFrameRing, _remap_to_gray
+from scanner.models import Scan, ScanPoint
+
+
+class FisheyeGrayTests(SimpleTestCase):
+    """Birleşik lens düzeltme + gri dönüşüm çekirdeği"""
+
+    @skipIf(_remap_to_gray is None, "numba kurulu değil")
+    def test_remap_to_gray_matches_opencv(self):
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+        corrector = FisheyeCorrector()
+        corrector.preload((64, 48))
+        map1, map2 = corrector._get_fast_maps(64, 48)
+
+        expected = cv2.cvtColor(
+            cv2.remap(frame, map1, map2, interpolation=cv2.INTER_NEAREST, borderMode=cv2.BORDER_CONSTANT),
+            cv2.COLOR_BGR2GRAY,
+        )
+        gray = corrector.correct_distortion_gray(frame)
+
+        self.assertEqual(gray.shape, expected.shape)
+        self.assertLessEqual(int(np.abs(gray.astype(np.int16) - expected).max()), 1)
+
+
+class MotorCommandQueueTests(SimpleTestCase):
+    """Öncelikli motor komut kuyruğu"""
+
+    def drain(self, queue):
+        angles = []
+        while True:
+            command = queue.get_next()
+            if command is None:
+                return angles
+            angles.append(command.angle)
+            queue.release(command)
+
+    def test_priority_then_insertion_order(self):
+        queue = MotorCommandQueue()
+        queue.add_command(10, priority=5)
+        queue.add_command(20, priority=1)
+        queue.add_command(30, priority=5)
+        queue.add_command(40, priority=1)
+
+        self.assertEqual(queue.peek_angle(), 20)
+        self.assertEqual(self.drain(queue), [20, 40, 10, 30])
+        self.assertIsNone(queue.get_next(timeout=0.01))
+
+    def test_coalesce_keeps_final_callback_and_waited_commands(self):
+        queue = MotorCommandQueue()
+        callback = mock.Mock()
+        queue.add_command(10)
+        queue.add_command(20, callback=callback)
+        queue.add_command(30, waited=True)
+        queue.add_command(40)
+        queue.add_command(50)
+
+        self.assertEqual(queue.coalesce(), 2)
+        self.assertEqual(self.drain(queue), [20, 30, 50])
+
+    def test_coalesce_single_command_is_noop(self):
+        queue = MotorCommandQueue()
+        queue.add_command(10)
+        self.assertEqual(queue.coalesce(), 0)
+        self.assertEqual(queue.size(), 1)
+
+    def test_released_commands_are_reset(self):
+        queue = MotorCommandQueue()
+        queue.add_command(10, callback=mock.Mock(), waited=True)
+        command = queue.get_next()
+        queue.release(command)
+        self.assertIsNone(command.callback)
+        self.assertFalse(command.waited)
+
+
+class StepDelayScheduleTests(SimpleTestCase):
+    """Adım bekleme çizelgesi, eski adım adım hesaplanan rampayla aynı olmalı"""
+
+    @staticmethod
+    def reference_delays(num_steps, base_delay, acceleration):
+        accel_steps = decel_steps = min(100, num_steps // 4)
+        delays = []
+        for step in range(num_steps):
+            if step < accel_steps:
+                progress = step / accel_steps
+                current_delay = base_delay * (3 - 2 * progress * acceleration)
+            elif step >= num_steps - decel_steps:
+                progress = (num_steps - step) / decel_steps
+                current_delay = base_delay * (3 - 2 * progress * acceleration)
+            else:
+                current_delay = base_delay
+            delays.append(max(0.0001, current_delay))
+        return delays
+
+    def test_matches_reference_ramp(self):
+        for num_steps, base_delay, acceleration in [
+            (1, 0.001, 1.2), (3, 0.001, 1.2), (40, 0.002, 1.0), (400, 0.001, 1.2), (2048, 0.0006, 1.3),
+        ]:
+            with self.subTest(num_steps=num_steps, base_delay=base_delay, acceleration=acceleration):
+                delays = _step_delay_schedule(num_steps, base_delay, acceleration)
+                self.assertEqual(len(delays), num_steps)
+                np.testing.assert_allclose(delays, self.reference_delays(num_steps, base_delay, acceleration))
+
+
+class LttbTests(SimpleTestCase):
+    """Largest-Triangle-Three-Buckets örnekleme"""
+
+    def test_short_input_is_returned_whole(self):
+        x = np.arange(10.0)
+        np.testing.assert_array_equal(dash_apps.lttb_indices(x, x, 20), np.arange(10))
+        np.testing.assert_array_equal(dash_apps.lttb_indices(x, x, 2), np.arange(10))
+
+    def test_keeps_endpoints_and_peak(self):
+        x = np.arange(1000.0)
+        y = np.zeros(1000)
+        y[537] = 100.0
+
+        indices = dash_apps.lttb_indices(x, y, 50)
+
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertIn(537, indices)
+
+
+class FrameBufferTests(SimpleTestCase):
+    """Önceden ayrılmış kare halka tamponu"""
+
+    @staticmethod
+    def frame(value):
+        return np.full((16, 16, 3), value, dtype=np.uint8)
+
+    def test_ring_keeps_last_frames(self):
+        buffer = FrameBuffer(size=3)
+        for value in range(5):
+            self.assertTrue(buffer.add_frame(self.frame(value), exposure=value))
+
+        self.assertEqual(len(buffer), 3)
+        np.testing.assert_array_equal(buffer.get_latest(), self.frame(4))
+        self.assertIsNone(buffer.get_by_id(1))
+        np.testing.assert_array_equal(buffer.get_by_id(2), self.frame(2))
+
+    def test_duplicate_frame_is_skipped(self):
+        buffer = FrameBuffer(size=3)
+        self.assertTrue(buffer.add_frame(self.frame(1)))
+        self.assertFalse(buffer.add_frame(self.frame(1)))
+        self.assertEqual(len(buffer), 1)
+
+    def test_latest_is_a_copy(self):
+        buffer = FrameBuffer(size=2)
+        buffer.add_frame(self.frame(7))
+        buffer.get_latest()[:] = 0
+        np.testing.assert_array_equal(buffer.get_latest(), self.frame(7))
+
+    def test_meta_window_is_oldest_first(self):
+        buffer = FrameBuffer(size=3)
+        self.assertEqual(len(buffer.get_meta_window(2)), 0)
+        for value in range(5):
+            buffer.add_frame(self.frame(value), exposure=value * 100)
+
+        self.assertEqual(buffer.get_meta_window(2)['id'].tolist(), [3, 4])
+        window = buffer.get_meta_window(10)
+        self.assertEqual(window['id'].tolist(), [2, 3, 4])
+        self.assertEqual(window['exposure'].tolist(), [200, 300, 400])
+
+    def test_clear(self):
+        buffer = FrameBuffer(size=3)
+        buffer.add_frame(self.frame(1))
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        self.assertIsNone(buffer.get_latest())
+        self.assertTrue(buffer.add_frame(self.frame(1)))
+
+
+class SharedFrameRingTests(SimpleTestCase):
+    """/dev/shm kare halkası: yazıcı ve ayrı bağlanan okuyucu"""
+
+    def setUp(self):
+        self.writer = SharedFrameRing(f"dreampi_test_{uuid.uuid4().hex[:8]}", slots=3, shape=(8, 12, 3))
+        self.addCleanup(self.writer.close)
+
+    def test_reader_sees_published_frames(self):
+        # Okuyucu normalde ayrı süreçtedir; aynı süreçte yazıcının resource_tracker kaydını silmesin
+        with mock.patch('multiprocessing.resource_tracker.unregister'):
+            reader = SharedFrameRing.attach(self.writer.name)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.frame_shape, (8, 12, 3))
+        self.assertEqual(reader.read_latest(), (-1, None))
+
+        for value in range(4):
+            self.assertTrue(self.writer.publish(np.full((8, 12, 3), value, dtype=np.uint8)))
+
+        seq, frame = reader.read_latest()
+        self.assertEqual(seq, 3)
+        np.testing.assert_array_equal(frame, np.full((8, 12, 3), 3, dtype=np.uint8))
+        self.assertFalse(frame.flags.writeable)
+        self.assertTrue(reader.read_latest(copy=True)[1].flags.writeable)
+
+    def test_publish_rejects_wrong_shape_or_dtype(self):
+        self.assertFalse(self.writer.publish(np.zeros((8, 8, 3), dtype=np.uint8)))
+        self.assertFalse(self.writer.publish(np.zeros((8, 12, 3), dtype=np.float32)))
+        self.assertEqual(self.writer.read_latest()[0], -1)
+
+
+class DataFrameStoreEncodingTests(SimpleTestCase):
+    """dcc.Store için DataFrame serileştirme"""
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'id': [3, 1, 2],
+            'x_cm': [1.5, -2.25, np.nan],
+            'cluster': [0, -1, 0],
+            'label': ['a', 'b', 'c'],
+        }, index=[10, 11, 12])
+
+    @skipIf(not dash_apps.PYARROW_AVAILABLE, "pyarrow kurulu değil")
+    def test_feather_round_trip(self):
+        stored = dash_apps.encode_dataframe(self.df)
+        self.assertEqual(stored['format'], 'feather')
+        json.dumps(stored)  # dcc.Store JSON'a yazabilmeli
+        pd.testing.assert_frame_equal(dash_apps.decode_dataframe(stored), self.df.reset_index(drop=True))
+
+    def test_json_fallback_round_trip(self):
+        with mock.patch.object(dash_apps, 'PYARROW_AVAILABLE', False):
+            stored = dash_apps.encode_dataframe(self.df)
+        self.assertEqual(stored['format'], 'json')
+        pd.testing.assert_frame_equal(dash_apps.decode_dataframe(stored), self.df, check_index_type=False)
+
+
+class StreamPositionTests(SimpleTestCase):
+    """SSE istemci konumunun başlık/parametrelerden okunması"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_query_parameters(self):
+        request = self.factory.get('/events/', {'scan_id': '14', 'last_id': '550'})
+        self.assertEqual(views._parse_stream_position(request), (14, 550, None))
+
+    def test_last_event_id_header_wins(self):
+        request = self.factory.get('/events/', {'scan_id': '1', 'last_id': '2'}, HTTP_LAST_EVENT_ID='14:560:RUN')
+        self.assertEqual(views._parse_stream_position(request), (14, 560, 'RUN'))
+
+    def test_invalid_input_starts_from_scratch(self):
+        self.assertEqual(views._parse_stream_position(self.factory.get('/events/', HTTP_LAST_EVENT_ID='x')),
+                         (0, 0, None))
+        self.assertEqual(views._parse_stream_position(self.factory.get('/events/', {'scan_id': 'a'})),
+                         (0, 0, None))
+        self.assertEqual(views._parse_stream_position(self.factory.get('/events/')), (0, 0, None))
+
+
+@mock.patch('dash_framework.views.close_old_connections')
+class ScanEventStreamTests(TestCase):
+    """SSE olay akışı: yalnızca yeni noktalar, dolu partiler beklemeden art arda"""
+
+    def setUp(self):
+        dash_apps._LATEST_SCAN_CACHE.update(key=None, time=0.0, scan_id=None)
+        self.scan = Scan.objects.create(status=Scan.Status.RUNNING)
+        self.points = [ScanPoint.objects.create(scan=self.scan, derece=float(i), mesafe_cm=50.0 + i)
+                       for i in range(5)]
+
+    def events(self, scan_id, last_id, status):
+        stream = views._scan_event_stream(scan_id, last_id, status, poll_interval=0.01, max_duration=0.1)
+        self.assertEqual(next(stream), "retry: 1000\n\n")
+        events = []
+        for chunk in stream:
+            head, data = chunk.split('\ndata: ')
+            events.append((head, json.loads(data)))
+        return events
+
+    def test_sends_new_points_in_batches(self, _close):
+        ids = [point.id for point in self.points]
+        with mock.patch.object(views, 'SCAN_EVENT_BATCH_SIZE', 2):
+            events = self.events(self.scan.id, ids[0], Scan.Status.RUNNING)
+
+        self.assertEqual([[row[0] for row in event['data']] for _, event in events],
+                         [ids[1:3], ids[3:5]])
+        self.assertEqual(events[-1][0], f"id: {self.scan.id}:{ids[-1]}:RUN")
+        self.assertEqual(events[0][1]['columns'], list(dash_apps.SCAN_POINT_FIELDS))
+        timestamp = events[0][1]['data'][0][dash_apps.SCAN_POINT_FIELDS.index('timestamp')]
+        self.assertRegex(timestamp, r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+
+    def test_status_change_without_new_points(self, _close):
+        Scan.objects.filter(pk=self.scan.id).update(status=Scan.Status.COMPLETED)
+        events = self.events(self.scan.id, self.points[-1].id, Scan.Status.RUNNING)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0][1]['status'], 'CMP')
+        self.assertEqual(events[0][1]['data'], [])
+
+    def test_new_scan_restarts_from_first_point(self, _close):
+        events = self.events(self.scan.id - 1, 12345, None)
+
+        self.assertEqual(events[0][1]['scan_id'], self.scan.id)
+        self.assertEqual([row[0] for row in events[0][1]['data']], [point.id for point in self.points])
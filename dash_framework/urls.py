@@ -6,5 +6,6 @@ app_name = 'dash_framework'
 urlpatterns = [
     path('', views.dashboard_display_view, name='realtime_dashboard'),
     path('camera/', views.camera_display_view, name='camera_display'),
+    path('events/scan/', views.scan_events_view, name='scan_events'),
 
 ]
\ No newline at end of file
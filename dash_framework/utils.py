@@ -7,6 +7,7 @@ import logging
 import math
 import numpy as np
 import hashlib
+import struct
 import threading
 import time
 import cv2
@@ -16,6 +17,7 @@ from collections import deque
 from datetime import datetime, timedelta
 from functools import wraps, lru_cache
 from dataclasses import dataclass
+from multiprocessing import shared_memory
 import json
 
 from dash_framework.config import CameraConfig, AppConfig, SensorConfig, PerformanceConfig, AIConfig
@@ -41,6 +43,18 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
+# Kare değişim tespiti için SIMD hızlandırmalı hash (opsiyonel, yoksa hashlib.blake2b)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+# Lens düzeltme + gri dönüşümünü tek geçişte yapan çekirdek için JIT (opsiyonel)
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 # Store güncellemeleri için kilit
 store_lock = threading.Lock()
 
@@ -415,17 +429,33 @@ class CircuitBreaker:
 # ============================================================================
 
 class FrameBuffer:
-    """Thread-safe frame buffer yönetimi (v3.16 Bellek Optimizasyonu)"""
+    """
+    Thread-safe frame buffer yönetimi (önceden ayrılmış halka tampon).
+    Kareler tek bir (N, H, W, C) dizisinde tutulur; ekleme tek bir kopyalamadır, yeni nesne ayrılmaz.
+    Kare bilgileri aynı indeksle yapılandırılmış bir NumPy dizisinde tutulur.
+    """
+
+    META_DTYPE = np.dtype([
+        ('id', 'i8'), ('ts', 'f8'), ('exposure', 'u4'), ('gain', 'f4'), ('framerate', 'f4')
+    ])
 
     def __init__(self, size: int = 3, max_age_seconds: int = 300):
-        self.buffer = deque(maxlen=size)
+        self.size = size
         self.lock = threading.Lock()
-        self.last_frame = None
         self.last_hash = None
         self.frame_id = 0
         self.max_age_seconds = max_age_seconds  # YENİ
+        # Kare dizisi ilk karede (veya çözünürlük değişince) ayrılır
+        self._frames: Optional[np.ndarray] = None
+        self.meta = np.zeros(size, dtype=self.META_DTYPE)
+        self.meta['id'] = -1
+        self._head = -1
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
 
-    def add_frame(self, frame: np.ndarray) -> bool:
+    def add_frame(self, frame: np.ndarray, exposure: int = 0, gain: float = 0.0, framerate: float = 0.0) -> bool:
         """Frame'i buffer'a ekle (duplicate kontrolü ile)"""
         with self.lock:
             frame_hash = self._calculate_frame_hash(frame)
@@ -433,70 +463,178 @@ class FrameBuffer:
             if frame_hash == self.last_hash:
                 return False
 
-            self.buffer.append({
-                'id': self.frame_id,
-                'frame': frame.copy(),
-                'hash': frame_hash,
-                'timestamp': time.time()
-            })
+            if self._frames is None or self._frames.shape[1:] != frame.shape or self._frames.dtype != frame.dtype:
+                self._frames = np.empty((self.size,) + frame.shape, dtype=frame.dtype)
+                self.meta['id'] = -1
+                self._count = 0
+
+            self._head = (self._head + 1) % self.size
+            np.copyto(self._frames[self._head], frame)
+            self.meta[self._head] = (self.frame_id, time.time(), exposure, gain, framerate)
+            self._count = min(self._count + 1, self.size)
 
-            self.last_frame = frame.copy()
             self.last_hash = frame_hash
             self.frame_id += 1
 
-            # Otomatik temizlik
-            self._cleanup_old_frames()
-
             return True
 
     def get_latest(self) -> Optional[np.ndarray]:
-        """En son frame'i al"""
+        """En son frame'in kopyasını al (çağıran üzerine çizim yapabilir)"""
+        with self.lock:
+            if self._count:
+                return self._frames[self._head].copy()
+            return None
+
+    def get_latest_view(self) -> Optional[np.ndarray]:
+        """En son frame'i kopyalamadan al - yalnızca okuma içindir, sonraki eklemelerde üzerine yazılır"""
         with self.lock:
-            if self.buffer:
-                return self.buffer[-1]['frame'].copy()
+            if self._count:
+                return self._frames[self._head]
             return None
 
     def get_by_id(self, frame_id: int) -> Optional[np.ndarray]:
-        """ID'ye göre frame al"""
+        """ID'ye göre frame al (max_age_seconds'tan eski kareler döndürülmez)"""
         with self.lock:
-            for item in self.buffer:
-                if item['id'] == frame_id:
-                    return item['frame'].copy()
+            slots = np.flatnonzero(self.meta['id'] == frame_id)
+            if slots.size and time.time() - self.meta['ts'][slots[0]] < self.max_age_seconds:
+                return self._frames[slots[0]].copy()
             return None
 
-    def _calculate_frame_hash(self, frame: np.ndarray) -> str:
-        """Frame hash'i hesapla (hızlı)"""
-        h, w = frame.shape[:2]
-        sample = np.concatenate([
-            frame[0:10, 0:10].flatten(),
-            frame[0:10, w-10:w].flatten(),
-            frame[h-10:h, 0:10].flatten(),
-            frame[h-10:h, w-10:w].flatten(),
-            frame[h//2-5:h//2+5, w//2-5:w//2+5].flatten()
-        ])
-        return hashlib.md5(sample.tobytes()).hexdigest()
-
-    def _cleanup_old_frames(self):
-        """Eski frame'leri temizle (YENİ v3.16)"""
-        current_time = time.time()
-        self.buffer = deque(
-            [item for item in self.buffer
-             if current_time - item['timestamp'] < self.max_age_seconds],
-            maxlen=self.buffer.maxlen
-        )
+    def get_meta_window(self, n: int) -> np.ndarray:
+        """Son n karenin bilgilerini eskiden yeniye sıralı yapılandırılmış dizi olarak al"""
+        with self.lock:
+            n = min(n, self._count)
+            if n <= 0:
+                return self.meta[:0].copy()
+            slots = np.arange(self._head - n + 1, self._head + 1) % self.size
+            return self.meta[slots]
+
+    def _calculate_frame_hash(self, frame: np.ndarray) -> bytes:
+        """Frame hash'i hesapla (hızlı) - tüm kareye yayılmış 8 pikselde bir örnek, 8 baytlık özet"""
+        sample = np.ascontiguousarray(frame[::8, ::8])
+        if blake3 is not None:
+            return blake3(sample).digest(length=8)
+        return hashlib.blake2b(sample, digest_size=8).digest()
 
     def clear(self):
-        """Buffer'ı temizle"""
+        """Buffer'ı temizle (ayrılmış bellek yeniden kullanılır)"""
         with self.lock:
-            self.buffer.clear()
-            self.last_frame = None
+            self.meta['id'] = -1
+            self._head = -1
+            self._count = 0
             self.last_hash = None
 
 
+class SharedFrameRing:
+    """
+    /dev/shm üzerinde paylaşımlı bellek halka tamponu (tek yazıcı, çok okuyucu).
+    Aynı makinedeki diğer süreçler (Dash, analiz, kayıt) kareleri kopyasız okuyabilir.
+    Başlık: yazılan son karenin sırası, zaman damgası, slot sayısı ve kare boyutu.
+    Yazıcı her zaman bir sonraki slota yazar; okuyucunun elindeki son kare slots-1 yayın boyunca bozulmaz.
+    """
+
+    HEADER = struct.Struct('<qdIIII')  # seq, ts, slots, yükseklik, genişlik, kanal
+    DATA_OFFSET = 64  # kare verisi önbellek satırına hizalı başlar
+
+    def __init__(self, name: str, slots: int = 3, shape: Optional[Tuple[int, ...]] = None, create: bool = True):
+        self.name = name
+        self._owner = create
+        if create:
+            h, w = shape[:2]
+            c = shape[2] if len(shape) > 2 else 1
+            size = self.DATA_OFFSET + slots * h * w * c
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Önceki çalıştırmadan kalan segment
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.HEADER.pack_into(self.shm.buf, 0, -1, 0.0, slots, h, w, c)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Okuyucu süreç çıkarken resource_tracker segmenti silmesin (sahibi yazıcıdır)
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            except Exception:
+                pass
+            _, _, slots, h, w, c = self.HEADER.unpack_from(self.shm.buf, 0)
+
+        self.slots = slots
+        self.frame_shape = (h, w, c) if c > 1 else (h, w)
+        self._frames = np.ndarray(
+            (slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf, offset=self.DATA_OFFSET
+        )
+        self._seq = -1
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedFrameRing':
+        """Yazıcının oluşturduğu segmente okuyucu olarak bağlan"""
+        return cls(name, create=False)
+
+    def publish(self, frame: np.ndarray) -> bool:
+        """Kareyi sıradaki slota yaz ve başlığı güncelle (boyut uymazsa False)"""
+        if frame.shape != self.frame_shape or frame.dtype != np.uint8:
+            return False
+        seq = self._seq + 1
+        np.copyto(self._frames[seq % self.slots], frame)
+        self.HEADER.pack_into(self.shm.buf, 0, seq, time.time(), self.slots, *self._shape3())
+        self._seq = seq
+        return True
+
+    def read_latest(self, copy: bool = False) -> Tuple[int, Optional[np.ndarray]]:
+        """(sıra, kare) döndür; kare varsayılan olarak salt okunur görünümdür"""
+        seq = self.HEADER.unpack_from(self.shm.buf, 0)[0]
+        if seq < 0:
+            return seq, None
+        frame = self._frames[seq % self.slots]
+        if copy:
+            return seq, frame.copy()
+        view = frame.view()
+        view.setflags(write=False)
+        return seq, view
+
+    def _shape3(self) -> Tuple[int, int, int]:
+        h, w = self.frame_shape[:2]
+        return h, w, self.frame_shape[2] if len(self.frame_shape) > 2 else 1
+
+    def close(self):
+        """Segmenti kapat; sahibi ise /dev/shm'den de sil"""
+        self._frames = None
+        try:
+            self.shm.close()
+            if self._owner:
+                self.shm.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            logger.debug("Paylaşımlı bellek kapatma: %s", e)
+
+
 # ============================================================================
 # LENS DİSTORSİYON DÜZELTME (OV5647 130°)
 # ============================================================================
 
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _remap_to_gray(src, map_xy, dst):
+        """BGR kareyi en yakın komşu remap ile okuyup doğrudan gri çıktıya yaz (ara renkli kare oluşmaz)"""
+        height, width = dst.shape
+        src_h, src_w = src.shape[0], src.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                sx = map_xy[y, x, 0]
+                sy = map_xy[y, x, 1]
+                if 0 <= sx < src_w and 0 <= sy < src_h:
+                    # ITU-R BT.601 ağırlıkları (29, 150, 77) / 256, BGR sırası
+                    dst[y, x] = (29 * np.int32(src[sy, sx, 0]) + 150 * np.int32(src[sy, sx, 1]) +
+                                 77 * np.int32(src[sy, sx, 2])) >> 8
+                else:
+                    dst[y, x] = 0
+else:
+    _remap_to_gray = None
+
+
 class FisheyeCorrector:
     """OV5647 130° geniş açı lens düzeltme"""
 
@@ -509,6 +647,9 @@ class FisheyeCorrector:
         self.map2 = None
         self.roi = None
         self.default_dist_coeffs = np.array(CameraConfig.DISTORTION_COEFFICIENTS)
+        # Çözünürlük başına bir kez hesaplanan remap tabloları
+        self._fast_maps: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+        self._fisheye_maps: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
 
     def calibrate_from_checkerboard(self, images: List[np.ndarray],
                                     pattern_size: Tuple[int, int] = (9, 6),
@@ -585,9 +726,54 @@ class FisheyeCorrector:
 
         return image
 
+    def correct_distortion_gray(self, image: np.ndarray) -> np.ndarray:
+        """
+        Hızlı lens düzeltme + gri dönüşümü. Numba varsa tek çekirdekte birleşik yapılır (renkli ara kare
+        yazılmaz); yoksa önce gri dönüşüm, sonra tek kanallı remap uygulanır.
+        """
+        if image is None or image.size == 0:
+            return image
+        if image.ndim == 2:
+            return self._correct_simple(image)
+
+        h, w = image.shape[:2]
+        map1, map2 = self._get_fast_maps(w, h)
+
+        if _remap_to_gray is not None:
+            gray = np.empty((h, w), dtype=np.uint8)
+            _remap_to_gray(np.ascontiguousarray(image), map1, gray)
+            return gray
+
+        return cv2.remap(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), map1, map2,
+                         interpolation=cv2.INTER_NEAREST,
+                         borderMode=cv2.BORDER_CONSTANT)
+
+    def preload(self, resolution: Tuple[int, int]):
+        """
+        Hızlı düzeltme tablolarını önceden hesapla ve gri remap çekirdeğini boş karede derle
+        (ilk yakalanan kare tablo ve ~1.5 sn'lik JIT maliyetini ödemesin)
+        """
+        w, h = resolution
+        self._get_fast_maps(w, h)
+        if _remap_to_gray is not None:
+            self.correct_distortion_gray(np.zeros((h, w, 3), dtype=np.uint8))
+
     def _correct_simple(self, image: np.ndarray) -> np.ndarray:
-        """Basit barrel distortion düzeltme"""
+        """Basit barrel distortion düzeltme (önceden hesaplanmış tek remap)"""
         h, w = image.shape[:2]
+        map1, map2 = self._get_fast_maps(w, h)
+        return cv2.remap(image, map1, map2,
+                         interpolation=cv2.INTER_NEAREST,
+                         borderMode=cv2.BORDER_CONSTANT)
+
+    def _get_fast_maps(self, w: int, h: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Basit düzeltme tablolarını oluştur: undistort + ROI kırpma + yeniden boyutlandırma tek bir
+        eşlemede birleştirilir, kare başına yalnızca bir cv2.remap kalır
+        """
+        maps = self._fast_maps.get((w, h))
+        if maps is not None:
+            return maps
 
         focal_length = w * 0.8
         center = (w/2, h/2)
@@ -604,30 +790,38 @@ class FisheyeCorrector:
             camera_matrix, dist_coeffs, (w,h), 0.8, (w,h)
         )
 
-        dst = cv2.undistort(image, camera_matrix, dist_coeffs, None, newcam)
+        map_x, map_y = cv2.initUndistortRectifyMap(
+            camera_matrix, dist_coeffs, None, newcam, (w, h), cv2.CV_32FC1
+        )
 
         if roi != (0, 0, 0, 0):
-            x, y, w, h = roi
-            dst = dst[y:y+h, x:x+w]
-            dst = cv2.resize(dst, (image.shape[1], image.shape[0]))
+            x, y, rw, rh = roi
+            map_x = cv2.resize(map_x[y:y+rh, x:x+rw], (w, h))
+            map_y = cv2.resize(map_y[y:y+rh, x:x+rw], (w, h))
 
-        return dst
+        # CV_16SC2 sabit noktalı format cv2.remap için en hızlısıdır; en yakın komşu için koordinatlar yuvarlanır
+        maps = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2, nninterpolation=True)
+        self._fast_maps[(w, h)] = maps
+        return maps
 
     def _correct_fisheye(self, image: np.ndarray) -> np.ndarray:
         """Balık gözü modeli ile düzeltme"""
         h, w = image.shape[:2]
 
-        K = np.array([[w/2, 0, w/2],
-                      [0, h/2, h/2],
-                      [0, 0, 1]], dtype=np.float32)
+        maps = self._fisheye_maps.get((w, h))
+        if maps is None:
+            K = np.array([[w/2, 0, w/2],
+                          [0, h/2, h/2],
+                          [0, 0, 1]], dtype=np.float32)
 
-        D = np.array([0.1, -0.2, 0.0, 0.0], dtype=np.float32)
+            D = np.array([0.1, -0.2, 0.0, 0.0], dtype=np.float32)
 
-        map1, map2 = cv2.fisheye.initUndistortRectifyMap(
-            K, D, np.eye(3), K, (w, h), cv2.CV_16SC2
-        )
+            maps = cv2.fisheye.initUndistortRectifyMap(
+                K, D, np.eye(3), K, (w, h), cv2.CV_16SC2
+            )
+            self._fisheye_maps[(w, h)] = maps
 
-        return cv2.remap(image, map1, map2,
+        return cv2.remap(image, maps[0], maps[1],
                          interpolation=cv2.INTER_LINEAR,
                          borderMode=cv2.BORDER_CONSTANT)
 
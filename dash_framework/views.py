@@ -1,6 +1,11 @@
+import json
+import time
+
+from django.db import close_old_connections
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from .camera_apps import app as camera_app
-from .dash_apps import app as dashboard_app
+from .dash_apps import app as dashboard_app, get_latest_scan, SCAN_POINT_FIELDS, SCAN_EVENT_BATCH_SIZE
 
 
 def dashboard_display_view(request):
@@ -11,4 +16,84 @@ def dashboard_display_view(request):
 
 
 def camera_display_view(request):
-    return render(request, "dashboard_app/camera.html")
\ No newline at end of file
+    return render(request, "dashboard_app/camera.html")
+
+
+_TIMESTAMP_INDEX = SCAN_POINT_FIELDS.index('timestamp')
+
+
+def _format_point_row(row):
+    """ScanPoint values_list satırını JSON'a hazırla (zaman damgası veri deposundaki biçimde)"""
+    row = list(row)
+    if row[_TIMESTAMP_INDEX] is not None:
+        row[_TIMESTAMP_INDEX] = row[_TIMESTAMP_INDEX].strftime('%Y-%m-%d %H:%M:%S')
+    return row
+
+
+def _parse_stream_position(request):
+    """
+    İstemcinin elindeki (tarama ID, son nokta ID, durum): yeniden bağlanmada Last-Event-ID başlığından,
+    ilk bağlantıda sorgu parametrelerinden
+    """
+    try:
+        last_event_id = request.headers.get('Last-Event-ID')
+        if last_event_id:
+            scan_id, last_id, status = last_event_id.split(':')
+            return int(scan_id), int(last_id), status
+        return int(request.GET.get('scan_id') or 0), int(request.GET.get('last_id') or 0), None
+    except ValueError:
+        return 0, 0, None
+
+
+def _scan_event_stream(scan_id, last_id, status, poll_interval=0.5, max_duration=30.0, keepalive_interval=15.0):
+    """
+    Yeni tarama noktalarını (id > last_id) ve durum değişikliklerini SSE olayı olarak gönder.
+    Akış max_duration sonunda biter; tarayıcı Last-Event-ID ile kaldığı yerden yeniden bağlanır
+    (worker thread ve DB bağlantısı süresiz tutulmaz).
+    """
+    from scanner.models import ScanPoint
+
+    started = last_sent = time.monotonic()
+    try:
+        yield "retry: 1000\n\n"
+        while time.monotonic() - started < max_duration:
+            scan = get_latest_scan()
+            if scan is not None:
+                # Yeni bir tarama başladıysa istemci noktaları baştan alır
+                if scan.id != scan_id:
+                    scan_id, last_id, status = scan.id, 0, None
+
+                rows = list(
+                    ScanPoint.objects.filter(scan_id=scan_id, id__gt=last_id)
+                    .order_by('id').values_list(*SCAN_POINT_FIELDS)[:SCAN_EVENT_BATCH_SIZE]
+                )
+                if rows or scan.status != status:
+                    if rows:
+                        last_id = rows[-1][0]
+                    status = scan.status
+                    event = {
+                        'scan_id': scan_id, 'status': status,
+                        'columns': SCAN_POINT_FIELDS, 'data': [_format_point_row(row) for row in rows]
+                    }
+                    last_sent = time.monotonic()
+                    yield f"id: {scan_id}:{last_id}:{status}\ndata: {json.dumps(event)}\n\n"
+                    # Parti dolduysa kalan noktalar beklemeden gönderilir
+                    if len(rows) == SCAN_EVENT_BATCH_SIZE:
+                        continue
+
+            if time.monotonic() - last_sent > keepalive_interval:
+                last_sent = time.monotonic()
+                yield ": keepalive\n\n"
+
+            time.sleep(poll_interval)
+    finally:
+        close_old_connections()
+
+
+def scan_events_view(request):
+    """Dashboard için Server-Sent Events akışı - yalnızca yeni noktaları ve durum değişikliklerini gönderir"""
+    scan_id, last_id, status = _parse_stream_position(request)
+    response = StreamingHttpResponse(_scan_event_stream(scan_id, last_id, status), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
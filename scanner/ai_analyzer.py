@@ -44,7 +44,8 @@ class AIAnalyzerService:
         if not queryset.exists():
             return "Analiz için uygun veri bulunamadı.", "No data to generate an image from."
 
-        df = pd.DataFrame(list(queryset.values('derece', 'dikey_aci', 'mesafe_cm')))
+        columns = ('derece', 'dikey_aci', 'mesafe_cm')
+        df = pd.DataFrame.from_records(queryset.values_list(*columns).iterator(chunk_size=5000), columns=columns)
         data_string = df.head(1000).to_string(index=False)
 
         print(f"[INFO] {len(df)} adet noktanın tamamı analiz için {self.config.model_name}'e gönderiliyor...")
@@ -249,10 +249,11 @@ class Scan(models.Model):
         logger.info(f"Scan ID {self.id} için analiz başlatılıyor...")
 
         # Geçerli noktaları filtrele
+        point_columns = ('x_cm', 'y_cm', 'z_cm')
         points_qs = self.points.filter(
             mesafe_cm__gt=0.1,
             mesafe_cm__lt=400.0
-        ).values('x_cm', 'y_cm', 'z_cm')
+        ).values_list(*point_columns)
 
         point_count = points_qs.count()
         self.point_count = point_count
@@ -264,7 +265,7 @@ class Scan(models.Model):
             return
 
         # DataFrame'e çevir
-        df = pd.DataFrame(list(points_qs))
+        df = pd.DataFrame.from_records(points_qs.iterator(chunk_size=5000), columns=point_columns)
         df.dropna(inplace=True)
 
         try: